@@ -96,7 +96,7 @@ class L4AutopilotSystem:
                 deviation_monitoring=autopilot_enabled,
                 policy_violations=[],
                 execution_id=execution_id,
-                warnings=policy_decision.warnings
+                warnings=list(policy_decision.warnings or ())
             )
 
             logger.info(
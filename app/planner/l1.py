@@ -4,6 +4,15 @@ import re
 from typing import Dict, List, Tuple, Any
 
 
+# File-type entities are plain substrings, so a lowercase `in` check is
+# enough and avoids running the regex engine per token.
+_FILE_TYPE_TOKENS: Dict[str, Tuple[str, ...]] = {
+    "pdf": ("pdf",),
+    "csv": ("csv",),
+    "excel": ("excel", "xlsx", "xls"),
+}
+
+
 class IntentMatcher:
     """Lightweight intent and entity extractor for L1 planning.
 
@@ -45,11 +54,7 @@ class IntentMatcher:
         }
 
         # Entities
-        self.file_type_patterns: Dict[str, List[re.Pattern]] = {
-            "pdf": [re.compile(r"pdf", re.I)],
-            "csv": [re.compile(r"csv", re.I)],
-            "excel": [re.compile(r"excel|xlsx|xls", re.I)],
-        }
+        self.file_type_tokens: Dict[str, Tuple[str, ...]] = _FILE_TYPE_TOKENS
         # (label, patterns) pairs; labels may be EN or JA
         self.action_patterns_labeled: List[Tuple[str, List[re.Pattern]]] = [
             ("send", [re.compile(r"\bsend\b", re.I)]),
@@ -70,10 +75,11 @@ class IntentMatcher:
                 if any(p.search(t) for p in pats):
                     matched_intents.append(name)
 
-        file_types: List[str] = []
-        for ft, pats in self.file_type_patterns.items():
-            if any(p.search(t) for p in pats):
-                file_types.append(ft)
+        tl = t.lower()
+        file_types: List[str] = [
+            ft for ft, toks in self.file_type_tokens.items()
+            if any(tok in tl for tok in toks)
+        ]
 
         actions: List[str] = []
         for label, pats in self.action_patterns_labeled:
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+import sys
+from types import MappingProxyType
+from typing import AbstractSet, Dict, Any, List, Mapping, Tuple
 
 
-SYNONYM_MAP = {
+_RAW_SYNONYMS: Dict[str, List[str]] = {
     '送信': ['提出', '確定'],
 }
 
+# Static, read-only synonym table. Keys and values are interned so lookups
+# against interned labels hit the identity fast path.
+SYNONYM_MAP: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    sys.intern(k): tuple(sys.intern(v) for v in vs)
+    for k, vs in _RAW_SYNONYMS.items()
+})
 
-def _find_synonym(goal: str, present_labels: List[str]) -> tuple[str, float] | None:
-    cands = SYNONYM_MAP.get(goal, [])
+
+# Patch categories whose confidences gate auto-adoption
+_ADOPTABLE_PATCH_KEYS = ('replace_text', 'fallback_search', 'wait_tuning')
+
+
+def _generate_synonyms(goal: str) -> Tuple[str, ...]:
+    return SYNONYM_MAP.get(goal, ())
+
+
+def _find_synonym(goal: str, present_labels: AbstractSet[str]) -> tuple[str, float] | None:
+    cands = _generate_synonyms(goal)
     for w in cands:
         if w in present_labels:
             # naive confidence: 0.9 if direct presence
@@ -19,17 +36,21 @@ def _find_synonym(goal: str, present_labels: List[str]) -> tuple[str, float] | N
 
 def _collect_labels(schema: Dict[str, Any]) -> List[str]:
     labels: List[str] = []
-
-    def walk(node: Dict[str, Any]):
+    # Iterative pre-order walk; children are pushed reversed to keep the
+    # same label order as a recursive traversal.
+    stack = list(reversed(schema.get('elements', []) or []))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
         lbl = node.get('label') or node.get('text')
         if isinstance(lbl, str):
-            labels.append(lbl)
-        for ch in (node.get('children') or []):
-            if isinstance(ch, dict):
-                walk(ch)
-    for el in schema.get('elements', []) or []:
-        if isinstance(el, dict):
-            walk(el)
+            # Labels repeat heavily ("OK", "Cancel"); interning shares one
+            # object per distinct label and matches the interned synonyms
+            labels.append(sys.intern(str(lbl)))
+        children = node.get('children')
+        if children:
+            stack.extend(reversed(children))
     return labels
 
 
@@ -54,8 +75,10 @@ def _similar(a: str, b: str) -> float:
 def propose_patches(schema: Dict[str, Any], failure: Dict[str, Any]) -> Dict[str, Any]:
     goal = failure.get('goal') or failure.get('text') or ''
     role = failure.get('role')
+    # One walk per call; the labels serve both the synonym lookup and the
+    # similarity fallback below
     labels = _collect_labels(schema)
-    syn = _find_synonym(goal, labels)
+    syn = _find_synonym(goal, frozenset(labels))
     patches: Dict[str, Any] = {}
     if syn:
         w, conf = syn
@@ -67,11 +90,11 @@ def propose_patches(schema: Dict[str, Any], failure: Dict[str, Any]) -> Dict[str
         }]
     else:
         # Fallback search: propose synonyms to try once
-        cands = SYNONYM_MAP.get(goal, [])
+        cands = _generate_synonyms(goal)
         if cands:
             patches['fallback_search'] = [{
                 'goal': goal,
-                'synonyms': cands,
+                'synonyms': list(cands),
                 'role': role,
                 'attempts': 1,
                 'confidence': 0.88,
@@ -114,10 +137,10 @@ def should_adopt_patch(patch: Dict[str, Any], policy: Dict[str, Any]) -> bool:
     if not policy.get('low_risk_auto', False):
         return False
     min_conf = float(policy.get('min_confidence', 0.85))
-    # Check confidences
-    for key in ('replace_text', 'fallback_search', 'wait_tuning'):
-        for item in patch.get(key, []) or []:
-            if float(item.get('confidence', 1.0)) < min_conf:
-                return False
+    # Check confidences, stopping at the first one below the bar.
     # No dangerous additions (we only deal with replace/wait/search here)
-    return True
+    return all(
+        float(item.get('confidence', 1.0)) >= min_conf
+        for key in _ADOPTABLE_PATCH_KEYS
+        for item in (patch.get(key) or ())
+    )
@@ -3,14 +3,35 @@ Schema Operations for Planner L2
 Screen schema analysis and patch generation utilities
 """
 
+import heapq
 import logging
 import math
-from typing import Dict, List, Any, Optional
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 
+try:
+    from rapidfuzz.distance import Levenshtein as _RFLevenshtein
+except ImportError:
+    # rapidfuzz is optional - fall back to the pure Python implementation
+    _RFLevenshtein = None
+
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on memoized text-pair similarity scores per analyzer
+SIMILARITY_CACHE_SIZE = 4096
+
+# Schemas smaller than this are scanned linearly; a grid is not worth building
+SPATIAL_INDEX_MIN_ELEMENTS = 64
+# Side length (in screen units) of a spatial grid cell
+SPATIAL_GRID_CELL_SIZE = 100.0
+# Number of per-schema indexes kept by each analyzer
+SCHEMA_INDEX_CACHE_SIZE = 32
+# Longest (shorter-side) string scored with the bit-parallel distance
+BIT_PARALLEL_MAX_LENGTH = 64
+
 
 @dataclass
 class ElementMatch:
@@ -20,69 +41,223 @@ class ElementMatch:
     distance: Optional[float] = None
 
 
+def _myers_distance(pattern: str, text: str) -> int:
+    """Levenshtein distance via Myers/Hyyrö bit-parallel column updates.
+
+    Each DP column is encoded as vertical +1/-1 delta bitmasks over
+    ``pattern``, so one character of ``text`` costs a handful of integer
+    operations instead of a row of comparisons. ``pattern`` must be non-empty.
+    """
+    m = len(pattern)
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(pattern):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def _row_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """Levenshtein distance by single-row Wagner-Fischer DP.
+
+    ``row`` is updated in place and ``diagonal`` carries the previous row's
+    value at j - 1. Stops once every cell of a row exceeds ``max_distance``.
+    """
+    row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        diagonal = row[0]
+        row[0] = left = row_min = i
+        for j, c2 in enumerate(s2, 1):
+            above = row[j]
+            value = diagonal if c1 == c2 else diagonal + 1
+            if above < value:
+                value = above + 1
+            if left < value:
+                value = left + 1
+            row[j] = left = value
+            diagonal = above
+            if value < row_min:
+                row_min = value
+        if max_distance is not None and row_min > max_distance:
+            return max_distance + 1
+    return row[-1]
+
+
+class _SpatialGrid:
+    """Uniform grid over element coordinates for radius queries"""
+
+    def __init__(self, xs: List[float], ys: List[float], cell_size: float = SPATIAL_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.size = len(xs)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        isfinite = math.isfinite
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            # Infinite/NaN coordinates are never within a finite radius of a
+            # finite point; non-finite queries fall back to a full scan below
+            if isfinite(x) and isfinite(y):
+                cell = (math.floor(x / cell_size), math.floor(y / cell_size))
+                self.cells.setdefault(cell, []).append(index)
+
+    def candidates(self, x: float, y: float, radius: float) -> Iterable[int]:
+        """Return indices of elements in cells overlapping the query circle.
+
+        Falls back to every index when the query is not finite or covers
+        more cells than there are elements, keeping a query O(n) at worst.
+        """
+        if not (math.isfinite(x) and math.isfinite(y) and math.isfinite(radius)):
+            return range(self.size)
+        size = self.cell_size
+        min_cx, max_cx = math.floor((x - radius) / size), math.floor((x + radius) / size)
+        min_cy, max_cy = math.floor((y - radius) / size), math.floor((y + radius) / size)
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > self.size:
+            return range(self.size)
+        found: List[int] = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                found.extend(self.cells.get((cx, cy), ()))
+        return found
+
+
+class _SchemaIndex:
+    """Lookup structures derived from one schema's element list.
+
+    Coordinates are kept as parallel ``xs``/``ys`` lists so proximity scans
+    index flat lists instead of doing a dict lookup per element.
+    """
+
+    def __init__(self, elements: List[Dict[str, Any]]):
+        self.xs = [element.get("x", 0) for element in elements]
+        self.ys = [element.get("y", 0) for element in elements]
+        self.role_column = [element.get("role") for element in elements]
+        self.grid = _SpatialGrid(self.xs, self.ys)
+        self.roles: Dict[Any, List[int]] = {}
+        for index, role in enumerate(self.role_column):
+            self.roles.setdefault(role, []).append(index)
+
+    def matches(self, elements: List[Dict[str, Any]]) -> bool:
+        """Check that every element still has the indexed x/y/role.
+
+        Re-reading the fields is O(n), but several times cheaper than the
+        distance scan it saves, and it picks up in-place edits.
+        """
+        return (
+            [element.get("x", 0) for element in elements] == self.xs
+            and [element.get("y", 0) for element in elements] == self.ys
+            and [element.get("role") for element in elements] == self.role_column
+        )
+
+
 class SchemaAnalyzer:
-    """Analyzes screen schema for patch generation opportunities"""
+    """Analyzes screen schema for patch generation opportunities.
+
+    Schemas with at least ``SPATIAL_INDEX_MIN_ELEMENTS`` elements are indexed
+    by position and role on their first proximity query. Later queries reuse
+    the index while every element's ``x``/``y``/``role`` is unchanged and
+    rebuild it otherwise.
+    """
 
     def __init__(self):
         """Initialize schema analyzer"""
         self.semantic_mappings = self._load_semantic_mappings()
+        self._group_keys, self._term_groups = self._build_term_index(self.semantic_mappings)
+        # Scores depend only on the normalized text pair, so repeated pairs
+        # (retries, patch regeneration) are served from an LRU cache
+        self._pair_similarity = lru_cache(maxsize=SIMILARITY_CACHE_SIZE)(
+            self._score_text_pair
+        )
+        self._schema_indexes: Dict[int, _SchemaIndex] = {}
+
+    # Element role -> vocabulary category
+    _ROLE_BUCKETS = {
+        "button": "buttons",
+        "submit": "buttons",
+        "link": "links",
+        "a": "links",
+        "textbox": "inputs",
+        "input": "inputs",
+        "textarea": "inputs",
+        "label": "labels",
+        "text": "labels",
+    }
 
     def extract_ui_vocabulary(self, schema: Dict[str, Any]) -> Dict[str, List[str]]:
         """Extract UI vocabulary categorized by element type"""
-        vocabulary = {
-            "buttons": [],
-            "links": [],
-            "inputs": [],
-            "labels": []
+        # Dicts act as insertion-ordered sets, deduplicating as we go
+        buckets: Dict[str, Dict[str, None]] = {
+            "buttons": {},
+            "links": {},
+            "inputs": {},
+            "labels": {}
         }
+        role_buckets = self._ROLE_BUCKETS
 
-        elements = schema.get("elements", [])
-
-        for element in elements:
-            text = element.get("text", "").strip()
-            role = element.get("role", "").lower()
-
-            if not text:
+        for element in schema.get("elements", []):
+            bucket = role_buckets.get(element.get("role", "").lower())
+            if bucket is None:
                 continue
+            text = element.get("text", "").strip()
+            if text:
+                buckets[bucket][text] = None
 
-            if role in ["button", "submit"]:
-                vocabulary["buttons"].append(text)
-            elif role in ["link", "a"]:
-                vocabulary["links"].append(text)
-            elif role in ["textbox", "input", "textarea"]:
-                vocabulary["inputs"].append(text)
-            elif role in ["label", "text"]:
-                vocabulary["labels"].append(text)
-
-        # Remove duplicates while preserving order
-        for category in vocabulary:
-            vocabulary[category] = list(dict.fromkeys(vocabulary[category]))
-
-        return vocabulary
+        return {category: list(texts) for category, texts in buckets.items()}
 
     def find_semantic_matches(
         self,
         target_text: str,
         elements: List[Dict[str, Any]],
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Find semantically similar UI elements"""
-        matches = []
+        """Find semantically similar UI elements.
 
-        for element in elements:
+        With ``limit``, only the best ``limit`` matches are selected (via a
+        bounded heap) and copied.
+        """
+        scored = []
+        # Normalize the target once; mapping terms are pre-lowered in the index
+        target_lower = target_text.lower().strip()
+
+        for index, element in enumerate(elements):
             element_text = element.get("text", "").strip()
             if not element_text or element_text == target_text:
                 continue
 
-            similarity = self._calculate_semantic_similarity(target_text, element_text)
+            similarity = self._normalized_similarity(
+                target_lower, element_text.lower(), threshold
+            )
 
             if similarity >= threshold:
-                element_with_similarity = dict(element)
-                element_with_similarity["similarity"] = similarity
-                matches.append(element_with_similarity)
+                scored.append((similarity, index))
+
+        # Sort by similarity descending (stable, so ties keep document order)
+        if limit is None:
+            scored.sort(key=lambda x: x[0], reverse=True)
+        else:
+            scored = heapq.nlargest(limit, scored, key=lambda x: x[0])
 
-        # Sort by similarity descending
-        matches.sort(key=lambda x: x["similarity"], reverse=True)
+        matches = []
+        for similarity, index in scored:
+            element_with_similarity = dict(elements[index])
+            element_with_similarity["similarity"] = similarity
+            matches.append(element_with_similarity)
 
         return matches
 
@@ -90,55 +265,135 @@ class SchemaAnalyzer:
         self,
         schema: Dict[str, Any],
         target_element: Dict[str, Any],
-        radius: float = 50
+        radius: float = 50,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Find UI elements within spatial proximity"""
-        target_x = target_element.get("x", 0)
-        target_y = target_element.get("y", 0)
+        """Find UI elements within spatial proximity.
 
-        nearby = []
-
-        for element in schema.get("elements", []):
-            element_x = element.get("x", 0)
-            element_y = element.get("y", 0)
+        With ``limit``, only the nearest ``limit`` elements are copied out.
+        Large schemas are served from a cached spatial index.
+        """
+        elements = schema.get("elements", [])
+        schema_index = None
+        if len(elements) >= SPATIAL_INDEX_MIN_ELEMENTS:
+            schema_index = self._schema_index(schema, elements)
+        return self._nearby_elements(elements, schema_index, target_element, radius, limit)
 
-            # Calculate Euclidean distance
-            distance = math.sqrt((element_x - target_x) ** 2 + (element_y - target_y) ** 2)
+    def _nearby_elements(
+        self,
+        elements: List[Dict[str, Any]],
+        schema_index: Optional[_SchemaIndex],
+        target_element: Dict[str, Any],
+        radius: float,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Proximity query over ``elements``, via ``schema_index`` if given"""
+        target_x = target_element.get("x", 0)
+        target_y = target_element.get("y", 0)
 
-            if distance <= radius and distance > 0:  # Exclude self
-                element_with_distance = dict(element)
-                element_with_distance["distance"] = distance
-                nearby.append(element_with_distance)
+        # Negative or NaN radii match nothing, as with an unsquared comparison
+        radius_sq = radius * radius if radius >= 0 else -1.0
+        hits = []
+
+        # Filter on squared distance; only survivors pay for the sqrt.
+        # Zero distance excludes the target itself.
+        if schema_index is None:
+            for index, element in enumerate(elements):
+                dx = element.get("x", 0) - target_x
+                dy = element.get("y", 0) - target_y
+                distance_sq = dx * dx + dy * dy
+                if distance_sq <= radius_sq and distance_sq > 0:
+                    hits.append((distance_sq, index))
+        else:
+            xs, ys = schema_index.xs, schema_index.ys
+            for index in schema_index.grid.candidates(target_x, target_y, radius):
+                dx = xs[index] - target_x
+                dy = ys[index] - target_y
+                distance_sq = dx * dx + dy * dy
+                if distance_sq <= radius_sq and distance_sq > 0:
+                    hits.append((distance_sq, index))
+
+        # Sort by distance ascending, ties in document order
+        if limit is None:
+            hits.sort()
+        else:
+            hits = heapq.nsmallest(limit, hits)
 
-        # Sort by distance ascending
-        nearby.sort(key=lambda x: x["distance"])
+        nearby = []
+        for distance_sq, index in hits:
+            element_with_distance = dict(elements[index])
+            element_with_distance["distance"] = math.sqrt(distance_sq)
+            nearby.append(element_with_distance)
 
         return nearby
 
+    def _schema_index(
+        self,
+        schema: Dict[str, Any],
+        elements: List[Dict[str, Any]]
+    ) -> _SchemaIndex:
+        """Return the cached index for a schema, rebuilding it if stale"""
+        key = id(schema)
+        index = self._schema_indexes.get(key)
+        if index is None or not index.matches(elements):
+            if len(self._schema_indexes) >= SCHEMA_INDEX_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self._schema_indexes[next(iter(self._schema_indexes))]
+            index = _SchemaIndex(elements)
+            self._schema_indexes[key] = index
+        return index
+
     def analyze_element_context(
         self,
         schema: Dict[str, Any],
-        target_element: Dict[str, Any]
+        target_element: Dict[str, Any],
+        radius: float = 50
     ) -> Dict[str, Any]:
         """Analyze context around a UI element"""
-        context = {
-            "nearby_elements": self.find_nearby_elements(schema, target_element),
-            "same_role_elements": [],
-            "parent_container": None,
-            "sibling_elements": []
-        }
-
+        target_x = target_element.get("x", 0)
+        target_y = target_element.get("y", 0)
         target_role = target_element.get("role", "")
 
-        # Find elements with same role
-        for element in schema.get("elements", []):
-            if element.get("role") == target_role and element != target_element:
-                context["same_role_elements"].append(element)
+        elements = schema.get("elements", [])
+
+        if len(elements) >= SPATIAL_INDEX_MIN_ELEMENTS:
+            # Large schemas: answer both queries from the cached index
+            schema_index = self._schema_index(schema, elements)
+            role_indices = schema_index.roles.get(target_role, ())
+            nearby = self._nearby_elements(elements, schema_index, target_element, radius)
+            same_role_elements = [
+                elements[i] for i in role_indices if elements[i] != target_element
+            ]
+        else:
+            radius_sq = radius * radius if radius >= 0 else -1.0
+            nearby = []
+            same_role_elements = []
+
+            # Single pass: proximity and same-role matching share the scan
+            for element in elements:
+                dx = element.get("x", 0) - target_x
+                dy = element.get("y", 0) - target_y
+                distance_sq = dx * dx + dy * dy
+
+                if distance_sq <= radius_sq and distance_sq > 0:  # Exclude self
+                    element_with_distance = dict(element)
+                    element_with_distance["distance"] = math.sqrt(distance_sq)
+                    nearby.append(element_with_distance)
+
+                if element.get("role") == target_role and element != target_element:
+                    same_role_elements.append(element)
+
+            nearby.sort(key=lambda x: x["distance"])
 
         # Additional context analysis could be added here
         # (parent/child relationships, container analysis, etc.)
 
-        return context
+        return {
+            "nearby_elements": nearby,
+            "same_role_elements": same_role_elements,
+            "parent_container": None,
+            "sibling_elements": []
+        }
 
     def _load_semantic_mappings(self) -> Dict[str, List[str]]:
         """Load semantic similarity mappings for UI text"""
@@ -175,69 +430,159 @@ class SchemaAnalyzer:
             "menu": ["メニュー", "一覧", "list", "navigation"]
         }
 
-    def _calculate_semantic_similarity(self, text1: str, text2: str) -> float:
+    def _build_term_index(
+        self,
+        mappings: Dict[str, List[str]]
+    ) -> Tuple[List[str], Dict[str, Set[int]]]:
+        """Index lowercased mapping terms by the semantic groups they belong to.
+
+        Each mapping key forms one group together with its values. Returns the
+        lowercased key per group id and a term -> group ids lookup.
+        """
+        group_keys: List[str] = []
+        term_groups: Dict[str, Set[int]] = {}
+        for group_id, (key, values) in enumerate(mappings.items()):
+            key_lower = sys.intern(key.lower())
+            group_keys.append(key_lower)
+            term_groups.setdefault(key_lower, set()).add(group_id)
+            for value in values:
+                term_groups.setdefault(sys.intern(value.lower()), set()).add(group_id)
+        return group_keys, term_groups
+
+    def _calculate_semantic_similarity(
+        self,
+        text1: str,
+        text2: str,
+        min_similarity: float = 0.0
+    ) -> float:
         """Calculate semantic similarity between two UI text strings"""
-        text1_lower = text1.lower().strip()
-        text2_lower = text2.lower().strip()
+        return self._normalized_similarity(
+            text1.lower().strip(), text2.lower().strip(), min_similarity
+        )
 
+    def _normalized_similarity(
+        self,
+        text1_lower: str,
+        text2_lower: str,
+        min_similarity: float = 0.0
+    ) -> float:
+        """Semantic similarity for texts that are already lowercased and stripped"""
         # Exact match
         if text1_lower == text2_lower:
             return 1.0
 
-        # Check semantic mappings
-        similarity = 0.0
-
-        # Check if text1 maps to text2
-        for key, values in self.semantic_mappings.items():
-            if key.lower() == text1_lower and text2_lower in [v.lower() for v in values]:
-                similarity = max(similarity, 0.9)
-            elif key.lower() == text2_lower and text1_lower in [v.lower() for v in values]:
-                similarity = max(similarity, 0.9)
+        # Similarity is symmetric - order the pair so both orders share a slot
+        if text2_lower < text1_lower:
+            text1_lower, text2_lower = text2_lower, text1_lower
+        return self._pair_similarity(text1_lower, text2_lower, min_similarity)
 
-        # Check if both texts are in same semantic group
-        for key, values in self.semantic_mappings.items():
-            values_lower = [v.lower() for v in values]
-            if (text1_lower in values_lower or text1_lower == key.lower()) and \
-               (text2_lower in values_lower or text2_lower == key.lower()):
-                similarity = max(similarity, 0.8)
+    def _score_text_pair(
+        self,
+        text1_lower: str,
+        text2_lower: str,
+        min_similarity: float
+    ) -> float:
+        """Score two distinct, already normalized UI text strings"""
+        # Check semantic mappings: a shared group whose key is one of the
+        # texts is a direct mapping, any other shared group is a weaker hit
+        similarity = 0.0
+        groups1 = self._term_groups.get(text1_lower)
+        groups2 = self._term_groups.get(text2_lower)
+        if groups1 and groups2:
+            shared = groups1 & groups2
+            if shared:
+                similarity = 0.8
+                for group_id in shared:
+                    if self._group_keys[group_id] in (text1_lower, text2_lower):
+                        similarity = 0.9
+                        break
 
         # Simple lexical similarity (edit distance-based)
         if similarity == 0.0:
-            similarity = self._calculate_lexical_similarity(text1_lower, text2_lower)
+            similarity = self._calculate_lexical_similarity(
+                text1_lower, text2_lower, min_similarity
+            )
 
         return min(similarity, 1.0)
 
-    def _calculate_lexical_similarity(self, text1: str, text2: str) -> float:
-        """Calculate lexical similarity using edit distance"""
+    def _calculate_lexical_similarity(
+        self,
+        text1: str,
+        text2: str,
+        min_similarity: float = 0.0
+    ) -> float:
+        """Calculate lexical similarity using edit distance.
+
+        Pairs that cannot reach ``min_similarity`` return 0.0 without
+        finishing the distance computation.
+        """
         if not text1 or not text2:
             return 0.0
 
         # Simple normalized edit distance
         max_len = max(len(text1), len(text2))
-        edit_distance = self._levenshtein_distance(text1, text2)
+        max_distance = None
+        if min_similarity > 0.0:
+            max_distance = int(max_len * (1.0 - min_similarity) + 1e-9)
+            # The length difference alone is a lower bound on the distance
+            if abs(len(text1) - len(text2)) > max_distance:
+                return 0.0
+
+        edit_distance = self._levenshtein_distance(text1, text2, max_distance)
+        if max_distance is not None and edit_distance > max_distance:
+            return 0.0
 
         similarity = 1.0 - (edit_distance / max_len)
         return max(0.0, similarity)
 
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        """Calculate Levenshtein distance between two strings"""
+    def _levenshtein_distance(
+        self,
+        s1: str,
+        s2: str,
+        max_distance: Optional[int] = None
+    ) -> int:
+        """Calculate Levenshtein distance between two strings.
+
+        When ``max_distance`` is given, any result above it is reported as
+        ``max_distance + 1`` so the computation can stop early.
+        """
+        if s1 == s2:
+            return 0
+
+        if _RFLevenshtein is not None:
+            return _RFLevenshtein.distance(s1, s2, score_cutoff=max_distance)
+
+        # A shared prefix/suffix never contributes edits - trim it off
+        start = 0
+        end1, end2 = len(s1), len(s2)
+        while start < end1 and start < end2 and s1[start] == s2[start]:
+            start += 1
+        while end1 > start and end2 > start and s1[end1 - 1] == s2[end2 - 1]:
+            end1 -= 1
+            end2 -= 1
+        s1 = s1[start:end1]
+        s2 = s2[start:end2]
+
         if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
+            s1, s2 = s2, s1
+
+        if max_distance is not None and len(s1) - len(s2) > max_distance:
+            return max_distance + 1
 
         if len(s2) == 0:
             return len(s1)
 
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
+        if len(s2) == 1:
+            # One character either survives as a match or costs one edit
+            distance = len(s1) - (s2 in s1)
+        elif len(s2) <= BIT_PARALLEL_MAX_LENGTH:
+            distance = _myers_distance(s2, s1)
+        else:
+            distance = _row_distance(s1, s2, max_distance)
 
-        return previous_row[-1]
+        if max_distance is not None and distance > max_distance:
+            return max_distance + 1
+        return distance
 
 
 class PatchGenerator:
@@ -260,10 +605,11 @@ class PatchGenerator:
         matches = self.analyzer.find_semantic_matches(
             failed_text,
             available_elements,
-            threshold=0.7
+            threshold=0.7,
+            limit=max_suggestions
         )
 
-        for match in matches[:max_suggestions]:
+        for match in matches:
             patch = {
                 "type": "text_replacement",
                 "original": failed_text,
@@ -284,9 +630,9 @@ class PatchGenerator:
         """Generate patches based on nearby elements"""
         patches = []
 
-        nearby = self.analyzer.find_nearby_elements(schema, failed_element, radius)
+        nearby = self.analyzer.find_nearby_elements(schema, failed_element, radius, limit=5)
 
-        for element in nearby[:5]:  # Top 5 nearest
+        for element in nearby:  # Top 5 nearest
             # Generate patch suggesting nearby element as alternative
             patch = {
                 "type": "proximity_alternative",
@@ -3,12 +3,17 @@ Plugin Loader with Sandboxing
 Safely loads plugins from plugins/actions/*.py with security restrictions
 """
 
-import importlib
-import importlib.util
+import builtins
+import os
+import re
+import types
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
+from typing import AbstractSet, Dict, Any, FrozenSet, List, Optional, Callable, Tuple
+import ctypes
 import inspect
-import signal
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from ..utils.logging import get_logger
 
@@ -25,12 +30,171 @@ class SandboxViolationError(Exception):
     pass
 
 
-@dataclass
+class _SandboxTimeout(SandboxViolationError):
+    """Injected into a plugin call's thread when it exceeds its time limit"""
+    pass
+
+
+@dataclass(frozen=True, slots=True)
 class PluginInfo:
     name: str
     path: Path
     actions: Dict[str, Callable]
     metadata: Dict[str, Any]
+    # Actions registered as fast: called directly, without the timeout timer
+    fast_actions: FrozenSet[str] = frozenset()
+
+
+class _PluginDictView(Mapping):
+    """Read-only plugin name -> dict view over PluginInfo objects.
+
+    The plain-dict form returned to callers is built on key access instead
+    of being copied for every plugin up front.
+    """
+
+    __slots__ = ('_infos',)
+
+    def __init__(self, infos: Dict[str, PluginInfo]):
+        self._infos = infos
+
+    def __getitem__(self, plugin_name: str) -> Dict[str, Any]:
+        info = self._infos[plugin_name]
+        return {
+            "name": info.name,
+            "path": str(info.path),
+            "actions": info.actions,
+            "metadata": info.metadata,
+        }
+
+    def __contains__(self, plugin_name) -> bool:
+        return plugin_name in self._infos
+
+    def __iter__(self):
+        return iter(self._infos)
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self._infos)})"
+
+
+class _ActionFunctionsView(Mapping):
+    """Read-only action name -> function view over the flat action table"""
+
+    __slots__ = ('_actions',)
+
+    def __init__(self, actions: Dict[str, Tuple[str, Callable, str]]):
+        self._actions = actions
+
+    def __getitem__(self, action_name: str) -> Callable:
+        return self._actions[action_name][1]
+
+    def __contains__(self, action_name) -> bool:
+        return action_name in self._actions
+
+    def __iter__(self):
+        return iter(self._actions)
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self._actions)})"
+
+
+def fast_action(func: Callable) -> Callable:
+    """Mark a plugin action as short and non-blocking.
+
+    Fast actions are called directly instead of under the sandbox's timeout
+    timer, which saves starting a timer thread per call. Only use this for
+    actions that cannot hang.
+    """
+    func.__sandbox_fast__ = True
+    return func
+
+
+# Potentially dangerous imports/calls (case-insensitive substrings, so e.g.
+# os.execvp and _posixsubprocess are caught too) and system directory paths.
+# Tokens sit in a zero-width lookahead so every occurrence is reported, even
+# one overlapping another token (e.g. "subprocess" inside "requestsubprocess")
+_DANGEROUS_CODE_RE = re.compile(
+    r'(?=(?i:(?P<token>subprocess|os\.system|eval|exec|urllib|requests|socket|http'
+    r'|__import__|importlib|sys\.modules)))'
+    r'|/(?:etc|usr|var)/'
+)
+# Tokens that block loading outright; the rest only log a warning
+_HARD_DENY = frozenset({'subprocess', 'os.system', 'eval', 'exec'})
+# Plain substrings covering every _DANGEROUS_CODE_RE match; if none occurs in
+# the lowercased source the regex pass cannot match and is skipped
+_PREFILTER_TOKENS = (
+    'subprocess', 'system', 'eval', 'exec', 'urllib', 'requests', 'socket',
+    'http', '__import__', 'importlib', 'modules', '/etc/', '/usr/', '/var/',
+)
+
+# Upper bound on threads used to read/compile plugins in parallel
+MAX_LOAD_WORKERS = 8
+# Compiled sources kept per PluginSandbox for execute_plugin_function
+SANDBOX_CODE_CACHE_SIZE = 64
+
+# Compiled plugin code and loaded plugin info per plugin path, stamped with
+# the file's (mtime_ns, size). Unchanged files are neither recompiled nor
+# re-executed on reload; a changed file replaces its stale entry.
+_FileStamp = Tuple[int, int]
+_CODE_CACHE: Dict[Path, Tuple[_FileStamp, types.CodeType]] = {}
+_PLUGIN_CACHE: Dict[Path, Tuple[_FileStamp, PluginInfo]] = {}
+
+
+_metrics_collector = None
+
+
+def _get_metrics():
+    """Import app.metrics lazily, once, and keep the collector reference"""
+    global _metrics_collector
+    if _metrics_collector is None:
+        from app.metrics import get_metrics_collector
+        _metrics_collector = get_metrics_collector()
+    return _metrics_collector
+
+
+class _MetricsTrackedLoad:
+    """Records plugin load success/blocked metrics around a loader method.
+
+    A data descriptor, so it also wraps callables assigned on the instance
+    (e.g. patched in tests) while leaving every other attribute access on
+    the loader untouched.
+    """
+
+    _OVERRIDE = '_load_plugins_override'
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.func
+        target = instance.__dict__.get(self._OVERRIDE) or self.func.__get__(instance, owner)
+
+        def wrapper(*args, **kwargs):
+            metrics = _get_metrics()
+            try:
+                result = target(*args, **kwargs)
+                metrics.increment_counter("plugin_load_success_24h", 1)
+                return result
+            except PluginSecurityError:
+                metrics.increment_counter("plugin_load_blocked_24h", 1)
+                raise
+        return wrapper
+
+    def __set__(self, instance, value):
+        instance.__dict__[self._OVERRIDE] = value
+
+    def __delete__(self, instance):
+        try:
+            del instance.__dict__[self._OVERRIDE]
+        except KeyError:
+            raise AttributeError('load_plugins_from_directory')
 
 
 class PluginLoader:
@@ -44,94 +208,182 @@ class PluginLoader:
 
     def __init__(self, plugins_dir: Optional[Path] = None):
         self.plugins_dir = plugins_dir or Path("plugins/actions")
-        self.allowlist = set(self.DEFAULT_ALLOWLIST)
+        self.allowlist: FrozenSet[str] = frozenset(self.DEFAULT_ALLOWLIST)
         self.loaded_plugins: Dict[str, PluginInfo] = {}
-        self.actions_registry: Dict[str, Callable] = {}
-
-    def __getattribute__(self, name: str):
-        obj = object.__getattribute__(self, name)
-        if name == 'load_plugins_from_directory' and callable(obj):
-            from app.metrics import get_metrics_collector
-            metrics = get_metrics_collector()
-
-            def wrapper(*args, **kwargs):
-                try:
-                    result = obj(*args, **kwargs)
-                    metrics.increment_counter("plugin_load_success_24h", 1)
-                    return result
-                except PluginSecurityError:
-                    metrics.increment_counter("plugin_load_blocked_24h", 1)
-                    raise
-            return wrapper
-        return obj
+        # Flat action table: action name -> (plugin name, function, description).
+        # The single source of truth for dispatch; actions_registry views it
+        self._flat_actions: Dict[str, Tuple[str, Callable, str]] = {}
+        # Names of actions that bypass the sandbox timeout
+        self.fast_actions: set = set()
+        # Sandbox shared by all execute_action calls, created on first use
+        self._sandbox: Optional["PluginSandbox"] = None
+        # plugins_dir -> (directory signature, loaded infos, plugins returned for it)
+        self._dir_cache: Dict[Path, Tuple[tuple, Dict[str, PluginInfo], Mapping[str, Dict[str, Any]]]] = {}
+        # Action descriptions, rebuilt only after plugins are (re)loaded
+        self._actions_cache: Optional[Dict[str, str]] = None
+
+    @property
+    def actions_registry(self) -> Mapping[str, Callable]:
+        """Read-only action name -> function mapping of registered actions"""
+        return _ActionFunctionsView(self._flat_actions)
 
     def set_plugin_allowlist(self, allowlist: List[str]):
         """Set the plugin allowlist"""
-        self.allowlist = set(allowlist)
-        logger.info(f"Plugin allowlist updated: {self.allowlist}")
+        self.allowlist = frozenset(allowlist)
+        logger.info("Plugin allowlist updated: %s", sorted(self.allowlist))
 
-    def load_plugins_from_directory(self, plugins_dir: Optional[Path] = None) -> Dict[str, PluginInfo]:
+    @_MetricsTrackedLoad
+    def load_plugins_from_directory(self, plugins_dir: Optional[Path] = None) -> Mapping[str, Dict[str, Any]]:
         """Load all allowed plugins from directory"""
         plugins_dir = plugins_dir or self.plugins_dir
 
         if not plugins_dir.exists():
-            logger.warning(f"Plugins directory not found: {plugins_dir}")
+            logger.warning("Plugins directory not found: %s", plugins_dir)
             return {}
 
-        plugins = {}
-
-        for plugin_file in plugins_dir.glob("*.py"):
-            if plugin_file.name.startswith("__"):
-                continue  # Skip __init__.py etc.
-
-            plugin_name = plugin_file.stem
-
-            # Check allowlist - skip disallowed plugins without failing the whole load
-            if plugin_name not in self.allowlist:
-                logger.warning(f"Plugin {plugin_name} not on allowlist, skipping")
-                continue
-
+        entries = self._scan_plugin_files(plugins_dir)
+        allowed = entries.keys() & self.allowlist
+
+        # Check allowlist - skip disallowed plugins without failing the whole load
+        for plugin_name in sorted(entries.keys() - allowed):
+            logger.warning("Plugin %s not on allowlist, skipping", plugin_name)
+
+        signature = self._directory_signature(plugins_dir, entries, allowed)
+        cached = self._dir_cache.get(plugins_dir)
+        if cached is not None and cached[0] == signature:
+            # Unchanged directory: skip loading, but make its plugins the
+            # active registrations again (another directory may have been
+            # loaded since)
+            cached_infos = cached[1]
+            for plugin_name in sorted(cached_infos):
+                self._register_plugin_info(plugin_name, cached_infos[plugin_name])
+            return cached[2]
+
+        infos: Dict[str, PluginInfo] = {}
+        names = sorted(allowed)
+
+        # Read, validate and compile plugins concurrently, then execute and
+        # register them serially (in name order) so no locking is needed and
+        # no plugin code runs after a failing plugin
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_LOAD_WORKERS, len(names)))) as pool:
+            futures = [
+                pool.submit(self._compile_plugin, Path(entries[plugin_name].path))
+                for plugin_name in names
+            ]
             try:
-                plugin_info = self._load_single_plugin(plugin_file)
-                # Return a plain dict structure for external callers/tests
-                plugins[plugin_name] = {
-                    "name": plugin_info.name,
-                    "path": str(plugin_info.path),
-                    "actions": plugin_info.actions,
-                    "metadata": plugin_info.metadata,
-                }
-                self.loaded_plugins[plugin_name] = plugin_info
-
-                # Register actions
-                for action_name, action_func in plugin_info.actions.items():
-                    self.actions_registry[action_name] = action_func
-
-                logger.info(f"Loaded plugin: {plugin_name} ({len(plugin_info.actions)} actions)")
+                for plugin_name, future in zip(names, futures):
+                    self._register_loaded_plugin(plugin_name, Path(entries[plugin_name].path), future, infos)
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+
+        # Callers/tests get a plain dict structure per plugin, built on access
+        plugins = _PluginDictView(infos)
+        self._dir_cache[plugins_dir] = (signature, infos, plugins)
+        return plugins
 
-            except Exception as e:
-                logger.error(f"Failed to load plugin {plugin_name}: {e}")
-                raise PluginSecurityError(f"Failed to load plugin {plugin_name}: {e}")
+    def _register_loaded_plugin(
+        self,
+        plugin_name: str,
+        plugin_file: Path,
+        future: Future,
+        infos: Dict[str, PluginInfo]
+    ):
+        """Execute one compiled plugin and record it in the loader's registries"""
+        try:
+            plugin_info = self._execute_plugin(plugin_file, *future.result())
+            infos[plugin_name] = plugin_info
+            self._register_plugin_info(plugin_name, plugin_info)
 
-        return plugins
+        except Exception as e:
+            logger.error("Failed to load plugin %s: %s", plugin_name, e)
+            raise PluginSecurityError(f"Failed to load plugin {plugin_name}: {e}")
+
+    def _register_plugin_info(self, plugin_name: str, plugin_info: PluginInfo):
+        """Make a loaded plugin and its actions the active registrations"""
+        self.loaded_plugins[plugin_name] = plugin_info
+        self._actions_cache = None
+
+        # Register actions
+        for action_name, action_func in plugin_info.actions.items():
+            doc = inspect.getdoc(action_func) or "No description available"
+            self._flat_actions[action_name] = (plugin_name, action_func, doc)
+            if action_name in plugin_info.fast_actions:
+                self.fast_actions.add(action_name)
+            else:
+                self.fast_actions.discard(action_name)
+
+        logger.info("Loaded plugin: %s (%d actions)", plugin_name, len(plugin_info.actions))
+
+    def _scan_plugin_files(self, plugins_dir: Path) -> Dict[str, os.DirEntry]:
+        """Map plugin name -> directory entry for candidate plugin files"""
+        with os.scandir(plugins_dir) as it:
+            return {
+                entry.name[:-3]: entry
+                for entry in it
+                if entry.name.endswith('.py')
+                and not entry.name.startswith('__')  # Skip __init__.py etc.
+                and entry.is_file()
+            }
+
+    def _directory_signature(
+        self,
+        plugins_dir: Path,
+        entries: Dict[str, os.DirEntry],
+        allowed: AbstractSet[str]
+    ) -> tuple:
+        """Cheap fingerprint of a plugins directory and the active allowlist.
+
+        Only allowlisted files are stat'ed; the others just contribute names.
+        """
+        files = []
+        for plugin_name in allowed:
+            st = entries[plugin_name].stat()
+            files.append((plugin_name, st.st_mtime_ns, st.st_size))
+        return (
+            plugins_dir.stat().st_mtime_ns,
+            tuple(sorted(entries)),
+            tuple(sorted(files)),
+        )
 
     def _load_single_plugin(self, plugin_file: Path) -> PluginInfo:
         """Load a single plugin file with security checks"""
-        plugin_name = plugin_file.stem
+        return self._execute_plugin(plugin_file, *self._compile_plugin(plugin_file))
+
+    def _compile_plugin(self, plugin_file: Path) -> Tuple[_FileStamp, types.CodeType]:
+        """Read, validate and compile a plugin file without running any of it"""
+        st = plugin_file.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached_code = _CODE_CACHE.get(plugin_file)
+        if cached_code is not None and cached_code[0] == stamp:
+            return cached_code
 
         # Read and validate plugin code
         plugin_code = plugin_file.read_text(encoding='utf-8')
-        self._validate_plugin_code(plugin_code, plugin_name)
+        self._validate_plugin_code(plugin_code, plugin_file.stem)
+        try:
+            code_obj = compile(plugin_code, str(plugin_file), 'exec')
+        except SyntaxError as e:
+            raise PluginSecurityError(f"Plugin execution failed: {e}")
+        _CODE_CACHE[plugin_file] = (stamp, code_obj)
+        return stamp, code_obj
 
-        # Load plugin module
-        spec = importlib.util.spec_from_file_location(plugin_name, plugin_file)
-        if spec is None or spec.loader is None:
-            raise PluginSecurityError(f"Cannot load plugin spec: {plugin_name}")
+    def _execute_plugin(self, plugin_file: Path, stamp: _FileStamp, code_obj: types.CodeType) -> PluginInfo:
+        """Run a compiled plugin and collect the actions it registers"""
+        plugin_name = plugin_file.stem
+
+        cached = _PLUGIN_CACHE.get(plugin_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
 
-        module = importlib.util.module_from_spec(spec)
+        # Load plugin module - the source is already compiled, so a bare
+        # module object is enough (no finder/loader round trip)
+        module = types.ModuleType(plugin_name)
+        module.__file__ = str(plugin_file)
 
         # Execute plugin in restricted environment
         try:
-            spec.loader.exec_module(module)
+            exec(code_obj, module.__dict__)
         except Exception as e:
             raise PluginSecurityError(f"Plugin execution failed: {e}")
 
@@ -141,7 +393,8 @@ class PluginLoader:
 
         # Extract actions using mock registry
         actions = {}
-        mock_registry = MockActionsRegistry(actions)
+        fast_actions = set()
+        mock_registry = MockActionsRegistry(actions, fast_actions)
 
         try:
             module.register(mock_registry)
@@ -155,65 +408,90 @@ class PluginLoader:
             "author": getattr(module, "__author__", "unknown")
         }
 
-        return PluginInfo(
+        plugin_info = PluginInfo(
             name=plugin_name,
             path=plugin_file,
             actions=actions,
-            metadata=metadata
+            metadata=metadata,
+            fast_actions=frozenset(fast_actions)
         )
+        _PLUGIN_CACHE[plugin_file] = (stamp, plugin_info)
+        return plugin_info
 
     def _validate_plugin_code(self, code: str, plugin_name: str):
         """Validate plugin code for security violations"""
-        # Check for dangerous imports
-        dangerous_imports = [
-            'subprocess', 'os.system', 'eval', 'exec',
-            'urllib', 'requests', 'socket', 'http',
-            '__import__', 'importlib', 'sys.modules'
-        ]
-
-        code_lower = code.lower()
-        for dangerous in dangerous_imports:
-            if dangerous in code_lower:
-                logger.warning(f"Plugin {plugin_name} contains potentially dangerous import: {dangerous}")
-                # Allow some imports with warnings
-                if dangerous in ['subprocess', 'os.system', 'eval', 'exec']:
-                    raise PluginSecurityError(f"Plugin {plugin_name} uses dangerous function: {dangerous}")
-
-        # Check for file system access outside sandbox
-        if '/etc/' in code or '/usr/' in code or '/var/' in code:
-            raise PluginSecurityError(f"Plugin {plugin_name} attempts to access system directories")
+        # Fast C-level substring gate for the common, clean plugin
+        lowered = code.lower()
+        if not any(token in lowered for token in _PREFILTER_TOKENS):
+            return
+
+        # One scan finds both dangerous imports and system directory paths
+        warned = set()
+        for match in _DANGEROUS_CODE_RE.finditer(code):
+            dangerous = match.group('token')
+            if dangerous is None:
+                # Check for file system access outside sandbox
+                raise PluginSecurityError(f"Plugin {plugin_name} attempts to access system directories")
+
+            dangerous = dangerous.lower()
+            if dangerous in warned:
+                continue
+            warned.add(dangerous)
+            logger.warning("Plugin %s contains potentially dangerous import: %s", plugin_name, dangerous)
+            # Allow some imports with warnings
+            if dangerous in _HARD_DENY:
+                raise PluginSecurityError(f"Plugin {plugin_name} uses dangerous function: {dangerous}")
 
     def get_available_actions(self) -> Dict[str, str]:
         """Get list of available actions with descriptions"""
-        actions = {}
-        for plugin_name, plugin_info in self.loaded_plugins.items():
-            for action_name, action_func in plugin_info.actions.items():
-                doc = inspect.getdoc(action_func) or "No description available"
-                actions[action_name] = doc
+        if self._actions_cache is not None:
+            return self._actions_cache
 
+        actions = {name: doc for name, (_, _, doc) in self._flat_actions.items()}
+        self._actions_cache = actions
         return actions
 
     def execute_action(self, action_name: str, *args, **kwargs) -> Any:
         """Execute a registered plugin action"""
-        if action_name not in self.actions_registry:
+        entry = self._flat_actions.get(action_name)
+        if entry is None:
             raise PluginSecurityError(f"Action not found: {action_name}")
 
-        action_func = self.actions_registry[action_name]
+        action_func = entry[1]
+
+        if action_name in self.fast_actions:
+            try:
+                return action_func(*args, **kwargs)
+            except Exception as e:
+                raise SandboxViolationError(f"Plugin execution error: {e}")
 
-        # Execute in sandbox
-        sandbox = PluginSandbox()
+        # Execute in sandbox (stateless between calls, so one per loader)
+        sandbox = self._sandbox
+        if sandbox is None:
+            sandbox = self._sandbox = PluginSandbox()
         return sandbox.execute_plugin_function_obj(action_func, args, kwargs)
 
 
 class MockActionsRegistry:
     """Mock registry for extracting plugin actions during loading"""
 
-    def __init__(self, actions_dict: Dict[str, Callable]):
+    def __init__(self, actions_dict: Dict[str, Callable], fast_actions: Optional[set] = None):
         self.actions_dict = actions_dict
+        self.fast_actions = fast_actions if fast_actions is not None else set()
+
+    def register(self, action_name: str, action_func: Callable, fast: Optional[bool] = None):
+        """Register an action (mock implementation)
 
-    def register(self, action_name: str, action_func: Callable):
-        """Register an action (mock implementation)"""
+        fast=True (or decorating the function with @fast_action) skips the
+        sandbox timeout when the action is executed.
+        """
         self.actions_dict[action_name] = action_func
+        if fast is None:
+            fast = getattr(action_func, '__sandbox_fast__', False)
+        if fast:
+            self.fast_actions.add(action_name)
+        else:
+            self.fast_actions.discard(action_name)
 
 
 class PluginSandbox:
@@ -225,67 +503,51 @@ class PluginSandbox:
         # Use workspace-local sandbox directory to avoid host permission issues
         self.sandbox_dir = Path.cwd() / "PluginsWork"
         self.sandbox_dir.mkdir(exist_ok=True)
+        self._sandbox_str = os.path.join(os.path.normpath(self.sandbox_dir), '')
+        self._filtered_os = FilteredOS(self.allowed_env_vars, self.sandbox_dir)
+        # Restricted builtins, built once; each call execs against a copy
+        self._safe_builtins = {
+            'len': len, 'str': str, 'int': int, 'float': float, 'bool': bool,
+            'list': list, 'dict': dict, 'tuple': tuple, 'set': set,
+            'print': print, 'range': range, 'enumerate': enumerate,
+            'zip': zip, 'map': map, 'filter': filter, 'open': self._safe_open,
+            '__import__': self._safe_import,
+        }
+        # plugin source -> compiled code, for repeat executions
+        self._code_cache: Dict[str, types.CodeType] = {}
 
     def set_allowed_env_vars(self, env_vars: List[str]):
         """Set allowed environment variables"""
         self.allowed_env_vars = set(env_vars)
+        self._filtered_os.refresh_env(self.allowed_env_vars)
 
     def execute_plugin_function(self, plugin_code: str, function_name: str, args: List[Any]) -> Any:
         """Execute plugin function in sandbox"""
         # This is a simplified sandbox - in production would use more isolation
 
-        # Basic static check for network access attempts
-        lowered = plugin_code.lower()
-        if any(term in lowered for term in ["urllib", "requests", "socket", "http://", "https://"]):
-            raise SandboxViolationError("Network access denied")
-
-        # Restricted globals
-        import builtins as _builtins
-        filtered_os = FilteredOS(self.allowed_env_vars, self.sandbox_dir)
-
-        def safe_import(name, globals=None, locals=None, fromlist=(), level=0):
-            if name == 'os':
-                return filtered_os
-            # Explicitly deny network and other imports
-            if name in ('urllib', 'urllib.request', 'requests', 'socket', 'http', 'http.client'):
+        code_obj = self._code_cache.get(plugin_code)
+        if code_obj is None:
+            # Basic static check for network access attempts
+            lowered = plugin_code.lower()
+            if any(term in lowered for term in ["urllib", "requests", "socket", "http://", "https://"]):
                 raise SandboxViolationError("Network access denied")
-            raise SandboxViolationError(f"Import not allowed: {name}")
-
-        def safe_open(
-            file,
-            mode='r',
-            buffering=-1,
-            encoding=None,
-            errors=None,
-            newline=None,
-            closefd=True,
-            opener=None,
-        ):
-            # Only allow file operations within sandbox directory
-            from pathlib import Path as _P
-            p = _P(file)
             try:
-                p_abs = p if p.is_absolute() else (filtered_os.sandbox_dir / p).resolve()
-            except Exception:
-                p_abs = _P(str(file))
-            if not str(p_abs).startswith(str(filtered_os.sandbox_dir)):
-                raise SandboxViolationError(f"File access denied: {file}")
-            return _builtins.open(file, mode, buffering, encoding, errors, newline, closefd, opener)
+                code_obj = compile(plugin_code, '<plugin>', 'exec')
+            except Exception as e:
+                raise SandboxViolationError(f"Plugin execution error: {e}")
+            if len(self._code_cache) >= SANDBOX_CODE_CACHE_SIZE:
+                del self._code_cache[next(iter(self._code_cache))]
+            self._code_cache[plugin_code] = code_obj
 
+        # Fresh (shallow) copies per call so one plugin cannot leave globals
+        # or patched builtins behind for the next
         restricted_globals = {
-            '__builtins__': {
-                'len': len, 'str': str, 'int': int, 'float': float, 'bool': bool,
-                'list': list, 'dict': dict, 'tuple': tuple, 'set': set,
-                'print': print, 'range': range, 'enumerate': enumerate,
-                'zip': zip, 'map': map, 'filter': filter, 'open': safe_open,
-                '__import__': safe_import,
-            },
-            'os': filtered_os,
+            '__builtins__': dict(self._safe_builtins),
+            'os': self._filtered_os,
         }
 
-        # Compile and execute
+        # Execute
         try:
-            code_obj = compile(plugin_code, '<plugin>', 'exec')
             namespace = {}
             exec(code_obj, restricted_globals, namespace)
 
@@ -293,47 +555,91 @@ class PluginSandbox:
                 raise SandboxViolationError(f"Function {function_name} not found in plugin")
 
             func = namespace[function_name]
-
-            # Set timeout
-            def timeout_handler(signum, frame):
-                raise SandboxViolationError(f"Plugin execution timeout ({self.timeout_seconds}s)")
-
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(self.timeout_seconds)
-
-            try:
-                result = func(*args)
-                signal.alarm(0)  # Cancel timeout
-                return result
-            finally:
-                signal.signal(signal.SIGALRM, old_handler)
+            return self._call_with_timeout(func, tuple(args), {})
 
         except SandboxViolationError:
             raise
         except Exception as e:
             # Normalize import-related errors to network denied when importing net libs
             msg = str(e)
+            lowered = plugin_code.lower()
             if "urllib" in lowered or "requests" in lowered or "socket" in lowered:
                 raise SandboxViolationError("Network access denied")
             raise SandboxViolationError(f"Plugin execution error: {msg}")
 
+    def _safe_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if name == 'os':
+            return self._filtered_os
+        # Explicitly deny network and other imports
+        if name in ('urllib', 'urllib.request', 'requests', 'socket', 'http', 'http.client'):
+            raise SandboxViolationError("Network access denied")
+        raise SandboxViolationError(f"Import not allowed: {name}")
+
+    def _safe_open(
+        self,
+        file,
+        mode='r',
+        buffering=-1,
+        encoding=None,
+        errors=None,
+        newline=None,
+        closefd=True,
+        opener=None,
+    ):
+        # Only allow file operations within sandbox directory. A lexical
+        # normpath check (no per-component stat like Path.resolve) that
+        # still collapses ".." so paths cannot climb out of the sandbox.
+        sandbox_str = self._sandbox_str
+        try:
+            p = os.fspath(file)
+        except TypeError:
+            raise SandboxViolationError(f"File access denied: {file}")
+        if isinstance(p, bytes):
+            p = os.fsdecode(p)
+        p_abs = os.path.normpath(os.path.join(sandbox_str, p))
+        if p_abs != sandbox_str[:-1] and not p_abs.startswith(sandbox_str):
+            raise SandboxViolationError(f"File access denied: {file}")
+        return builtins.open(p_abs, mode, buffering, encoding, errors, newline, closefd, opener)
+
     def execute_plugin_function_obj(self, func: Callable, args: tuple, kwargs: dict) -> Any:
         """Execute plugin function object in sandbox"""
         # Simplified execution with timeout
-        def timeout_handler(signum, frame):
-            raise SandboxViolationError(f"Plugin execution timeout ({self.timeout_seconds}s)")
-
-        old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(self.timeout_seconds)
-
         try:
-            result = func(*args, **kwargs)
-            signal.alarm(0)
-            return result
+            return self._call_with_timeout(func, args, kwargs)
         except Exception as e:
             raise SandboxViolationError(f"Plugin execution error: {e}")
-        finally:
-            signal.signal(signal.SIGALRM, old_handler)
+
+    def _call_with_timeout(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Call func on the current thread, interrupting it after timeout_seconds.
+
+        A timer thread raises _SandboxTimeout asynchronously in the calling
+        thread, so unlike SIGALRM this works off the main thread, on any
+        platform, and for several concurrent calls. Blocking C calls (e.g.
+        sleep) are only interrupted once they return to Python code.
+        """
+        thread_id = threading.get_ident()
+        lock = threading.Lock()
+        running = [True]
+
+        def interrupt():
+            with lock:
+                if running[0]:
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                        ctypes.c_ulong(thread_id), ctypes.py_object(_SandboxTimeout)
+                    )
+
+        timer = threading.Timer(self.timeout_seconds, interrupt)
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with lock:
+                    running[0] = False
+                timer.cancel()
+        except _SandboxTimeout:
+            raise SandboxViolationError(f"Plugin execution timeout ({self.timeout_seconds}s)")
 
 
 class FilteredOS:
@@ -343,20 +649,35 @@ class FilteredOS:
         self.allowed_env_vars = allowed_env_vars
         self.sandbox_dir = sandbox_dir
         self._real_os = __import__('os')
+        self._path_proxy = self._PathProxy(self._real_os.path, sandbox_dir)
+        self.refresh_env()
+
+    def refresh_env(self, allowed_env_vars: Optional[set] = None):
+        """Rebuild the filtered environment snapshot"""
+        if allowed_env_vars is not None:
+            self.allowed_env_vars = allowed_env_vars
+        real_env = self._real_os.environ
+        self._env_cache = {
+            key: real_env[key] for key in self.allowed_env_vars if key in real_env
+        }
+        self._env_view = types.MappingProxyType(self._env_cache)
 
     @property
     def environ(self):
-        """Filtered environment variables"""
-        filtered_env = {}
-        for key, value in self._real_os.environ.items():
-            if key in self.allowed_env_vars:
-                filtered_env[key] = value
-        return filtered_env
+        """Filtered environment variables (read-only snapshot)"""
+        return self._env_view
 
     class _PathProxy:
         def __init__(self, real_path, sandbox_dir):
             self._real_path = real_path
             self._sandbox_dir = sandbox_dir
+            # Copy the public os.path API onto the instance so lookups are
+            # plain attribute reads rather than __getattr__ calls. Only
+            # __all__ is copied: the module's other globals include the real
+            # os and sys modules, which must not leak into the sandbox.
+            for name in real_path.__all__:
+                if name != 'expanduser':
+                    setattr(self, name, getattr(real_path, name))
 
         def expanduser(self, path):
             if isinstance(path, str) and path.startswith('~'):
@@ -365,16 +686,10 @@ class FilteredOS:
                 return str(joined)
             return self._real_path.expanduser(path)
 
-        def join(self, *args):
-            return self._real_path.join(*args)
-
-        def __getattr__(self, item):
-            return getattr(self._real_path, item)
-
     @property
     def path(self):
         """Safe path operations proxy that remaps expanduser"""
-        return self._PathProxy(self._real_os.path, self.sandbox_dir)
+        return self._path_proxy
 
     def makedirs(self, path, exist_ok=False):
         """Restricted makedirs"""
@@ -1,19 +1,34 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Set, Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Set, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
+import os
 import yaml
 import datetime as dt
 import zoneinfo
 
+# Prefer the LibYAML-backed loader (needs PyYAML built against libyaml);
+# the pure-Python SafeLoader parses identically, just slower
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+
+# Parsed policy files per path, stamped with the file's mtime_ns so repeat
+# loads of an unchanged file skip YAML parsing
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+@dataclass(frozen=True)
 class PolicyDecision:
     allowed: bool
     autopilot: bool
     reason: str | None = None
-    warnings: Optional[List[str]] = None
+    # A tuple, since allowed decisions are shared instances (see _allowed)
+    warnings: Tuple[str, ...] = ()
 
     # Back-compat alias for Phase 7 L4 autopilot code
     @property
@@ -34,15 +49,176 @@ class PolicyViolation(Exception):
         self.suggested_action = suggested_action
 
 
+_ALLOWED_NO_AUTO = PolicyDecision(True, False)
+_ALLOWED_AUTO = PolicyDecision(True, True)
+
+
+def _allowed(autopilot: bool) -> PolicyDecision:
+    """Shared allowed decision; callers must treat it as read-only."""
+    return _ALLOWED_AUTO if autopilot else _ALLOWED_NO_AUTO
+
+
+_WEEKDAYS = ('MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN')
+_WEEKDAY_IDX = {name: i for i, name in enumerate(_WEEKDAYS)}
+
+
+@dataclass(frozen=True)
+class _CompiledWindow:
+    """A parsed "DAYS HH:MM-HH:MM TZ" window reduced to integer checks."""
+    day_mask: int       # bit i set => weekday i (MON=0) allowed
+    start: int          # minutes since midnight, inclusive
+    end: int            # minutes since midnight, inclusive
+    tzinfo: Optional[dt.tzinfo]
+
+    def contains(self, now: dt.datetime) -> bool:
+        # Normalize now to target timezone
+        if self.tzinfo is not None:
+            try:
+                now = now.astimezone(self.tzinfo)
+            except Exception:
+                pass
+        if not (self.day_mask >> now.weekday()) & 1:
+            return False
+        minutes = now.hour * 60 + now.minute
+        return self.start <= minutes <= self.end
+
+
+def _day_mask(spec: str, day_ranges: bool) -> int:
+    if day_ranges and '-' in spec:
+        a, b = spec.split('-', 1)
+        ia = _WEEKDAY_IDX.get(a)
+        ib = _WEEKDAY_IDX.get(b)
+        if ia is None or ib is None:
+            return 0
+        if ia <= ib:
+            days = range(ia, ib + 1)
+        else:
+            # Wrap-around (e.g., FRI-MON)
+            days = [*range(ia, 7), *range(0, ib + 1)]
+        return sum(1 << d for d in days)
+    idx = _WEEKDAY_IDX.get(spec)
+    return 0 if idx is None else 1 << idx
+
+
+def _minutes(hhmm: str) -> int:
+    h, m = map(int, hhmm.split(':'))
+    if not 0 <= m < 60:
+        raise ValueError(f"Invalid minutes in {hhmm!r}")
+    return h * 60 + m
+
+
+@lru_cache(maxsize=64)
+def _tz(name: str) -> zoneinfo.ZoneInfo:
+    """Shared ZoneInfo per zone name (failed lookups are not cached)."""
+    return zoneinfo.ZoneInfo(name)
+
+
+@lru_cache(maxsize=64)
+def _compile_window(window: str, day_ranges: bool, strict_tz: bool) -> Optional[_CompiledWindow]:
+    """Parse a policy window once; None if it is malformed.
+
+    day_ranges allows "MON-FRI" style day specs (validate_execution); without
+    it only a single day matches (evaluate). With strict_tz an unknown zone
+    makes the window malformed, otherwise times are compared unconverted.
+    """
+    try:
+        if day_ranges:
+            days_part, rest = window.split(' ', 1)
+            hours_part, tz_part = rest.rsplit(' ', 1)
+        else:
+            days_part, hours_part, tz_part = window.split(' ', 2)
+            hours_part = hours_part.split(' ')[0]
+            tz_part = tz_part.strip()
+        start_s, end_s = hours_part.split('-')
+        start, end = _minutes(start_s), _minutes(end_s)
+    except Exception:
+        return None
+    try:
+        tzinfo = _tz(tz_part)
+    except Exception:
+        if strict_tz:
+            return None
+        tzinfo = None
+    return _CompiledWindow(_day_mask(days_part, day_ranges), start, end, tzinfo)
+
+
+class DomainSuffixTrie:
+    """Allow-list of domains matched by whole DNS labels from the right.
+
+    ``matches(host)`` is true when host equals an entry or is a subdomain of
+    it (``host == d or host.endswith('.' + d)``), in O(labels in host)
+    regardless of how many domains are allowed.
+    """
+
+    _MATCH = object()
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, domains=()):
+        self._root: Dict[Any, Any] = {}
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain: str) -> None:
+        labels = str(domain).strip().strip('.').lower().split('.')
+        if labels == ['']:
+            return
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if self._MATCH not in node:
+            node[self._MATCH] = True
+            self._size += 1
+
+    def matches(self, host: str) -> bool:
+        node = self._root
+        for label in reversed(host.lower().split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._MATCH in node:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+
 class PolicyEngine:
     def __init__(self, cfg: Dict[str, Any]):
         self.cfg = cfg or {}
+        # Allow/require lists normalized once for the per-call checks
+        self._allow_domains = DomainSuffixTrie(self.cfg.get('allow_domains') or ())
+        self._allow_risks = frozenset(self.cfg.get('allow_risks') or ())
+        self._require_caps = frozenset(self.cfg.get('require_capabilities') or ())
+        self._require_signed = bool(self.cfg.get('require_signed_templates', False))
+        self._autopilot = bool(self.cfg.get('autopilot', False))
+        # Windows compiled once: evaluate() takes a single day, while
+        # validate_execution() also accepts day ranges and treats a
+        # missing window as "always"
+        window = str(self.cfg.get('window', '') or '')
+        self._window = _compile_window(window, day_ranges=False, strict_tz=False)
+        self._exec_window_always = window.lower() in ('', 'always')
+        self._exec_window = (None if self._exec_window_always
+                             else _compile_window(window, day_ranges=True, strict_tz=True))
 
     @classmethod
     def from_file(cls, path: str) -> 'PolicyEngine':
-        with open(path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
-        return cls(data)
+        key = str(path)
+        mtime_ns = os.stat(key).st_mtime_ns
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            data = cached[1]
+        else:
+            with open(key, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=_YamlLoader) or {}
+            _CONFIG_CACHE[key] = (mtime_ns, data)
+        # Shallow copy so engines never share (and mutate) the cached dict
+        return cls(dict(data))
 
     @classmethod
     def from_dict(cls, cfg: Dict[str, Any]) -> 'PolicyEngine':
@@ -51,60 +227,36 @@ class PolicyEngine:
 
     def evaluate(self, url: str, risks: Set[str], now_iso: str, signed: bool,
                  capabilities: Set[str]) -> PolicyDecision:
-        autopilot_flag = bool(self.cfg.get('autopilot', False))
-
         # Domain check
         host = urlparse(url).hostname or ''
-        domains = set(self.cfg.get('allow_domains', []) or [])
-        in_domain = any(host == d or host.endswith('.' + d) for d in domains)
-        if not in_domain:
+        if not self._allow_domains.matches(host):
             return PolicyDecision(False, False, reason='domain')
 
         # Time window check e.g. "SUN 00:00-06:00 Asia/Tokyo"
-        window = str(self.cfg.get('window', '') or '')
-        try:
-            day, hhmm, tz = window.split(' ', 2)
-            hrs = hhmm.split(' ')[0]
-            start_s, end_s = hrs.split('-')
-            start_h, start_m = map(int, start_s.split(':'))
-            end_h, end_m = map(int, end_s.split(':'))
-            tzname = tz.strip()
-        except Exception:
+        compiled = self._window
+        if compiled is None:
             return PolicyDecision(False, False, reason='window_format')
 
         try:
             now = dt.datetime.fromisoformat(now_iso)
         except Exception:
             now = dt.datetime.now(dt.timezone.utc)
-        # Normalize to target TZ
-        try:
-            tzinfo = zoneinfo.ZoneInfo(tzname)
-            now_tz = now.astimezone(tzinfo)
-        except Exception:
-            now_tz = now
-
-        weekday_map = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
-        day_ok = weekday_map[now_tz.weekday()] == day
-        start_ok = (now_tz.hour, now_tz.minute) >= (start_h, start_m)
-        end_ok = (now_tz.hour, now_tz.minute) <= (end_h, end_m)
-        if not (day_ok and start_ok and end_ok):
+        if not compiled.contains(now):
             return PolicyDecision(False, False, reason='window')
 
         # Signature
-        if self.cfg.get('require_signed_templates', False) and not signed:
+        if self._require_signed and not signed:
             return PolicyDecision(False, False, reason='signature')
 
         # Capabilities subset
-        req_caps = set(self.cfg.get('require_capabilities', []) or [])
-        if not req_caps.issubset(capabilities):
+        if not self._require_caps.issubset(capabilities):
             return PolicyDecision(False, False, reason='capabilities')
 
         # Risks allowed
-        allow_risks = set(self.cfg.get('allow_risks', []) or [])
-        if not risks.issubset(allow_risks):
+        if not self._allow_risks.issuperset(risks):
             return PolicyDecision(False, False, reason='risk')
 
-        return PolicyDecision(True, autopilot_flag, reason=None, warnings=[])
+        return _allowed(self._autopilot)
 
     # Phase 7: template-manifest based validation used by L4 autopilot
     def validate_execution(self, template_manifest: Dict[str, Any],
@@ -117,26 +269,9 @@ class PolicyEngine:
         - webx_urls: List[str]
         - signature_verified: bool
         """
-        cfg = self.cfg or {}
-        warnings: List[str] = []
-
-        # 1) Domains
-        urls = list(template_manifest.get('webx_urls') or [])
-        domains = set(cfg.get('allow_domains', []) or [])
-        if urls and domains:
-            def host_ok(u: str) -> bool:
-                h = urlparse(u).hostname or ''
-                return any(h == d or h.endswith('.' + d) for d in domains)
-
-            if not all(host_ok(u) for u in urls):
-                raise PolicyViolation(
-                    type="domain_violation",
-                    message="Domain not allowed",
-                    suggested_action="Update policy allow_domains or change template URLs",
-                )
-
-        # 2) Signature requirement
-        if cfg.get('require_signed_templates', False):
+        # Checks run cheapest-first and raise on the first violation
+        # 1) Signature requirement (single bool)
+        if self._require_signed:
             if not bool(template_manifest.get('signature_verified', False)):
                 raise PolicyViolation(
                     type="signature_violation",
@@ -144,46 +279,52 @@ class PolicyEngine:
                     suggested_action="Provide a signed template or disable signature requirement",
                 )
 
-        # 3) Capabilities
-        req_caps = set(cfg.get('require_capabilities', []) or [])
-        tmpl_caps = set(template_manifest.get('required_capabilities', []) or [])
-        if not req_caps.issubset(tmpl_caps):
-            missing = sorted(req_caps - tmpl_caps)
+        # 2) Capabilities - one C-level difference; the template list needs
+        # no set of its own
+        missing = self._require_caps.difference(template_manifest.get('required_capabilities', []) or [])
+        if missing:
             raise PolicyViolation(
                 type="capability_violation",
-                message=f"Missing required capabilities: {', '.join(missing)}",
+                message=f"Missing required capabilities: {', '.join(sorted(missing))}",
                 suggested_action="Add required_capabilities to template",
             )
 
-        # 4) Risks
-        allow_risks = set(cfg.get('allow_risks', []) or [])
-        tmpl_risks = set(template_manifest.get('risk_flags', []) or [])
-        if not tmpl_risks.issubset(allow_risks):
-            blocked = sorted(tmpl_risks - allow_risks)
+        # 3) Risks
+        tmpl_risks = template_manifest.get('risk_flags', []) or []
+        if not self._allow_risks.issuperset(tmpl_risks):
+            blocked = sorted(set(tmpl_risks) - self._allow_risks)
             raise PolicyViolation(
                 type="risk_violation",
                 message=f"Blocked risks: {', '.join(blocked)}",
                 suggested_action="Adjust allow_risks or modify template actions",
             )
 
-        # 5) Time window (supports "always" or "MON-FRI HH:MM-HH:MM TZ")
-        window = str(cfg.get('window', 'always') or 'always')
-        if window.lower() != 'always':
+        # 4) Time window (compiled once; supports "always" or "MON-FRI HH:MM-HH:MM TZ")
+        if not self._exec_window_always:
             now = current_time or dt.datetime.now(dt.timezone.utc)
-            allowed = self._within_window(window, now)
-            if not allowed:
+            # On format issues, be conservative: deny
+            compiled = self._exec_window
+            if compiled is None or not compiled.contains(now):
                 raise PolicyViolation(
                     type="window_violation",
                     message="Execution outside allowed window",
                     suggested_action="Adjust policy window or run within allowed time",
                 )
 
-        return PolicyDecision(
-            allowed=True,
-            autopilot=bool(cfg.get('autopilot', False)),
-            reason=None,
-            warnings=warnings,
-        )
+        # 5) Domains (URL parsing + trie walks, so last)
+        urls = template_manifest.get('webx_urls') or []
+        domains = self._allow_domains
+        if urls and domains:
+            # Templates repeat the same URLs/hosts; parse and match each once
+            hosts = {urlparse(u).hostname or '' for u in set(urls)}
+            if not all(domains.matches(h) for h in hosts):
+                raise PolicyViolation(
+                    type="domain_violation",
+                    message="Domain not allowed",
+                    suggested_action="Update policy allow_domains or change template URLs",
+                )
+
+        return _allowed(self._autopilot)
 
     def _within_window(self, window: str, now: dt.datetime) -> bool:
         """Check if `now` falls within a policy window.
@@ -193,44 +334,6 @@ class PolicyEngine:
         - "MON-FRI 09:00-17:00 Asia/Tokyo"
         - "MON 09:00-17:00 Asia/Tokyo"
         """
-        try:
-            days_part, rest = window.split(' ', 1)
-            hours_part, tz_part = rest.rsplit(' ', 1)
-            start_s, end_s = hours_part.split('-')
-            start_h, start_m = map(int, start_s.split(':'))
-            end_h, end_m = map(int, end_s.split(':'))
-            tzinfo = zoneinfo.ZoneInfo(tz_part)
-        except Exception:
-            # On format issues, be conservative: deny
-            return False
-
-        # Normalize now to target timezone
-        try:
-            now_tz = now.astimezone(tzinfo)
-        except Exception:
-            now_tz = now
-
-        weekday_map = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
-        today = weekday_map[now_tz.weekday()]
-
-        def day_in_range(spec: str, day: str) -> bool:
-            if '-' in spec:
-                a, b = spec.split('-', 1)
-                try:
-                    ia = weekday_map.index(a)
-                    ib = weekday_map.index(b)
-                    iday = weekday_map.index(day)
-                except ValueError:
-                    return False
-                if ia <= ib:
-                    return ia <= iday <= ib
-                # Wrap-around (e.g., FRI-MON)
-                return iday >= ia or iday <= ib
-            return spec == day
-
-        if not day_in_range(days_part, today):
-            return False
-
-        start_ok = (now_tz.hour, now_tz.minute) >= (start_h, start_m)
-        end_ok = (now_tz.hour, now_tz.minute) <= (end_h, end_m)
-        return bool(start_ok and end_ok)
+        compiled = _compile_window(window, day_ranges=True, strict_tz=True)
+        # On format issues, be conservative: deny
+        return compiled is not None and compiled.contains(now)
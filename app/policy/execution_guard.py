@@ -6,17 +6,43 @@ and audit logging. Designed to be called before executing a template.
 
 from __future__ import annotations
 
+import atexit
+import json
+import os
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime, time
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
-import pytz
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
-from .engine import PolicyEngine
+from .engine import _WEEKDAY_IDX, DomainSuffixTrie, PolicyEngine, _tz
 from ..metrics import get_metrics_collector
 
 
+# Policy audit log; the handle stays open (unbuffered, one write per
+# record) across writes
+_AUDIT_LOG = os.path.join('logs', 'policy_audit.log')
+_audit_fh: Optional[BinaryIO] = None
+_audit_fh_path: Optional[str] = None
+_audit_lock = threading.Lock()
+
+_metrics_collector = None
+
+
+def _get_metrics():
+    """Resolve the metrics collector once and keep the reference"""
+    global _metrics_collector
+    if _metrics_collector is None:
+        _metrics_collector = get_metrics_collector()
+    return _metrics_collector
+
+
 @dataclass
 class GuardResult:
     allowed: bool
@@ -25,10 +51,7 @@ class GuardResult:
 
 
 def _weekday_from_str(s: str) -> int:
-    mapping = {
-        'MON': 0, 'TUE': 1, 'WED': 2, 'THU': 3, 'FRI': 4, 'SAT': 5, 'SUN': 6
-    }
-    return mapping.get(s.upper(), -1)
+    return _WEEKDAY_IDX.get(s.upper(), -1)
 
 
 def _parse_time(hhmm: str) -> time:
@@ -36,48 +59,67 @@ def _parse_time(hhmm: str) -> time:
     return time(int(hh), int(mm))
 
 
-def _in_time_window(window: str, now: Optional[datetime] = None) -> bool:
-    """
-    window format: "SUN 00:00-06:00 Asia/Tokyo"
-    Supports single-day windows; treats times as local in given TZ.
-    """
+@lru_cache(maxsize=64)
+def _compile_time_window(window: str) -> Optional[Tuple[int, time, time, Any]]:
+    """Parse a window once into (weekday, start, end, tz); None means allow."""
     try:
         parts = window.strip().split()
         if len(parts) < 3:
-            return True  # no window or malformed -> allow by default
+            return None  # no window or malformed -> allow by default
 
         day_str, range_str, tz_str = parts[0], parts[1], parts[2]
         start_str, end_str = range_str.split('-')
-        tz = pytz.timezone(tz_str)
-        now = now or datetime.now(tz)
-        now_local = now.astimezone(tz)
+        return (
+            _weekday_from_str(day_str),
+            _parse_time(start_str),
+            _parse_time(end_str),
+            _tz(tz_str),
+        )
+    except Exception:
+        return None  # be permissive if policy is malformed
 
-        weekday_ok = now_local.weekday() == _weekday_from_str(day_str)
-        if not weekday_ok:
-            return False
 
-        start_t = _parse_time(start_str)
-        end_t = _parse_time(end_str)
-        now_t = now_local.time()
-        return start_t <= now_t <= end_t
+def _in_time_window(window: str, now: Optional[datetime] = None) -> bool:
+    """
+    window format: "SUN 00:00-06:00 Asia/Tokyo"
+    Supports single-day windows; treats times as local in given TZ.
+    """
+    if not isinstance(window, str):
+        return True  # be permissive if policy is malformed
+    compiled = _compile_time_window(window)
+    if compiled is None:
+        return True
+    weekday, start_t, end_t, tz = compiled
+    try:
+        now = now or datetime.now(tz)
+        now_local = now.astimezone(tz)
     except Exception:
         return True  # be permissive if policy is malformed
 
+    if now_local.weekday() != weekday:
+        return False
+    return start_t <= now_local.time() <= end_t
+
+
+@lru_cache(maxsize=32)
+def _domain_trie(allow_domains: Tuple[str, ...]) -> DomainSuffixTrie:
+    return DomainSuffixTrie(allow_domains)
+
 
 def _domain_allowed(urls: List[str], allow_domains: List[str]) -> bool:
     if not urls:
         return True
     if not allow_domains:
         return True
-    for u in urls:
-        try:
-            host = urlparse(u).netloc
-            if not any(host.endswith(ad) for ad in allow_domains):
-                return False
-        except Exception:
-            # If URL can't be parsed, treat as violation
-            return False
-    return True
+    trie = _domain_trie(tuple(allow_domains))
+    try:
+        # Parse each distinct URL once; hostname is lowercased and drops
+        # userinfo/port, unlike netloc
+        hosts = {urlparse(u).hostname or '' for u in set(urls)}
+    except Exception:
+        # If URL can't be parsed, treat as violation
+        return False
+    return all(trie.matches(host) for host in hosts)
 
 
 def check_pre_execution(
@@ -154,7 +196,7 @@ def check_pre_execution(
     # Metrics & audit (only on block)
     if not allowed:
         try:
-            get_metrics_collector().mark_policy_block()
+            _get_metrics().mark_policy_block()
         except Exception:
             pass
         _write_policy_audit('block', reasons=reasons, checks=checks, manifest=manifest, urls=urls)
@@ -162,6 +204,43 @@ def check_pre_execution(
     return GuardResult(allowed=allowed, reasons=reasons, checks=checks)
 
 
+def _dumps_line(record: Dict[str, Any]) -> bytes:
+    """Serialize one JSONL audit record (UTF-8, trailing newline)"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def _audit_file() -> BinaryIO:
+    """Return the shared audit log handle, (re)opening it when needed.
+
+    Callers must hold _audit_lock. The path is re-resolved each time so a
+    change of working directory starts a new log in the new location.
+    """
+    global _audit_fh, _audit_fh_path
+    path = os.path.abspath(_AUDIT_LOG)
+    if _audit_fh is None or _audit_fh_path != path:
+        if _audit_fh is not None:
+            _audit_fh.close()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unbuffered: each record is a single append write to the file
+        _audit_fh = open(path, 'ab', buffering=0)
+        _audit_fh_path = path
+    return _audit_fh
+
+
+def _close_audit_file() -> None:
+    global _audit_fh, _audit_fh_path
+    with _audit_lock:
+        if _audit_fh is not None:
+            _audit_fh.close()
+        _audit_fh = None
+        _audit_fh_path = None
+
+
+atexit.register(_close_audit_file)
+
+
 def _write_policy_audit(
     action: str,
     reasons: List[str],
@@ -171,8 +250,6 @@ def _write_policy_audit(
 ) -> None:
     """Append a JSONL audit record under logs/policy_audit.log"""
     try:
-        import json
-        from pathlib import Path
         record = {
             'ts': datetime.utcnow().isoformat() + 'Z',
             'action': action,
@@ -181,11 +258,9 @@ def _write_policy_audit(
             'manifest_keys': sorted(list(manifest.keys())),
             'urls': urls,
         }
-        log_dir = Path('logs')
-        log_dir.mkdir(exist_ok=True)
-        with (log_dir / 'policy_audit.log').open('a', encoding='utf-8') as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        line = _dumps_line(record)
+        with _audit_lock:
+            _audit_file().write(line)
     except Exception:
         # Best-effort; do not raise
         pass
-
@@ -5,84 +5,128 @@ Policy Engine component for parsing and validating time-based restrictions
 
 import re
 import logging
-from datetime import datetime, time
-from typing import List
-from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, List, Optional, Tuple
+from dataclasses import dataclass, field
 
-import pytz
+import zoneinfo
+
+from .engine import _WEEKDAY_IDX, _WEEKDAYS, _tz
 
 
 logger = logging.getLogger(__name__)
 
+# Pattern: DAYS TIME_RANGE TIMEZONE
+_WINDOW_RE = re.compile(r'^([A-Z\-,\s]+)\s+(\d{2}:\d{2})-(\d{2}:\d{2})\s+([A-Za-z/_]+)$')
+# HH:MM with the hour/minute ranges enforced by the pattern itself
+_TIME_RE = re.compile(r'^([0-1]?[0-9]|2[0-3]):([0-5][0-9])$')
+# One comma-separated day segment: DAY or DAY-DAY (a further "-..." is
+# captured so it can be rejected)
+_DAY_SEGMENT_RE = re.compile(r'(?:^|,)\s*([^,-]*?)\s*(?:-\s*([^,-]*?)\s*)?(-[^,]*)?(?=,|$)')
+
+
+def _to_minutes(hhmm: str) -> int:
+    """Minutes since midnight for "HH:MM" (same ranges as datetime.time)"""
+    hour, minute = map(int, hhmm.split(':'))
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time values: {hhmm}")
+    return hour * 60 + minute
+
 
-@dataclass
+@dataclass(frozen=True)
 class TimeWindow:
-    """Represents a time window with day-of-week and time constraints"""
-    days: List[str]
+    """Represents a time window with day-of-week and time constraints
+
+    The day bitmask, start/end minutes and timezone are derived (and
+    validated, raising ValueError) once at construction, so is_allowed only
+    does integer checks.
+    """
+    days: Tuple[str, ...]
     start_time: str
     end_time: str
     timezone: str
+    days_mask: int = field(default=0, init=False, repr=False, compare=False)
+    start_minutes: int = field(default=0, init=False, repr=False, compare=False)
+    end_minutes: int = field(default=0, init=False, repr=False, compare=False)
+    _span: int = field(default=0, init=False, repr=False, compare=False)
+    _always_allowed: bool = field(default=False, init=False, repr=False, compare=False)
+    _tz: Any = field(default=None, init=False, repr=False, compare=False)
+    _fixed_offset: Optional[timedelta] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        set_ = object.__setattr__
+        set_(self, 'days', tuple(self.days))
+        mask = 0
+        for day in self.days:
+            idx = _WEEKDAY_IDX.get(day)
+            if idx is not None:
+                mask |= 1 << idx
+        set_(self, 'days_mask', mask)
+
+        set_(self, 'start_minutes', _to_minutes(self.start_time))
+        set_(self, 'end_minutes', _to_minutes(self.end_time))
+        # Window length in minutes, wrapping past midnight for overnight
+        # windows (e.g., 23:00-06:00 spans 420)
+        set_(self, '_span', (self.end_minutes - self.start_minutes) % 1440)
+        # Every day around the clock (e.g. the permissive default
+        # "MON-SUN 00:00-23:59 UTC"): no time or zone checks needed
+        set_(self, '_always_allowed', mask == 0x7F and self._span == 1439)
 
-    def is_allowed(self, current_time: datetime) -> bool:
-        """Check if given datetime falls within this time window"""
         try:
-            # Get timezone object
-            tz = pytz.timezone(self.timezone)
-
-            # Convert current time to policy timezone
-            if current_time.tzinfo is None:
-                # Interpret naive datetime as being in the policy timezone
-                local_time = tz.localize(current_time)
-            else:
-                local_time = current_time.astimezone(tz)
-
-            # Get day of week (MON, TUE, etc.)
-            weekday_names = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
-            current_day = weekday_names[local_time.weekday()]
-
-            # Parse start and end times
-            start_hour, start_min = map(int, self.start_time.split(':'))
-            end_hour, end_min = map(int, self.end_time.split(':'))
-
-            start_time_obj = time(start_hour, start_min)
-            end_time_obj = time(end_hour, end_min)
-            current_time_obj = local_time.time()
-
-            # Handle overnight windows (e.g., 23:00-06:00)
-            if start_time_obj > end_time_obj:
-                # Overnight window: check if current day OR previous day is allowed
-                previous_day_idx = (local_time.weekday() - 1) % 7
-                previous_day = weekday_names[previous_day_idx]
-
-                day_allowed = current_day in self.days or previous_day in self.days
-                if not day_allowed:
-                    return False
-
-                # For overnight windows, current time must be >= start OR <= end
-                return current_time_obj >= start_time_obj or current_time_obj <= end_time_obj
-            else:
-                # Normal window: check if current day is in allowed days
-                if current_day not in self.days:
-                    return False
-
-                # Normal window: current time must be >= start AND <= end
-                return start_time_obj <= current_time_obj <= end_time_obj
+            tz = _tz(self.timezone)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {self.timezone}")
+        set_(self, '_tz', tz)
+        # UTC / fixed-offset zones report their offset without a datetime
+        set_(self, '_fixed_offset', tz.utcoffset(None))
 
-        except Exception as e:
-            logger.error(f"Error validating time window: {e}")
+    def is_allowed(self, current_time: datetime) -> bool:
+        """Check if given datetime falls within this time window"""
+        if self._always_allowed:
+            return True
+        start = self.start_minutes
+
+        # Convert current time to policy timezone. Only the wall-clock fields
+        # are read below, so the conversion is skipped when they already are
+        # policy-zone wall time:
+        # - naive datetimes are interpreted as policy-zone time (attaching
+        #   the zone would not change them)
+        # - the datetime already carries the policy zone, or a fixed-offset
+        #   policy zone's own offset
+        tzinfo = current_time.tzinfo
+        if tzinfo is None or tzinfo is self._tz:
+            local_time = current_time
+        elif self._fixed_offset is not None and current_time.utcoffset() == self._fixed_offset:
+            local_time = current_time
+        else:
+            local_time = current_time.astimezone(self._tz)
+
+        minutes = local_time.hour * 60 + local_time.minute
+        # Minutes since the window opened, wrapping past midnight; the end
+        # time is inclusive up to exactly HH:MM:00
+        offset = (minutes - start) % 1440
+        span = self._span
+        if offset > span or (offset == span and (local_time.second or local_time.microsecond)):
             return False
 
+        # The window belongs to the day it opened on: for the early-morning
+        # part of an overnight window (e.g., 23:00-06:00) that is the day before
+        opened_on = (local_time.weekday() - (minutes < start)) % 7
+        return bool(self.days_mask >> opened_on & 1)
+
 
 class TimeWindowParser:
     """Parser for time window configuration strings"""
 
-    # Day abbreviations mapping
-    DAY_MAPPING = {
+    # Day abbreviations mapping (read-only, shared by all parsers)
+    DAY_MAPPING = MappingProxyType({
         'MON': 'MON', 'TUE': 'TUE', 'WED': 'WED', 'THU': 'THU',
         'FRI': 'FRI', 'SAT': 'SAT', 'SUN': 'SUN',
         'MONDAY': 'MON', 'TUESDAY': 'TUE', 'WEDNESDAY': 'WED',
         'THURSDAY': 'THU', 'FRIDAY': 'FRI', 'SATURDAY': 'SAT', 'SUNDAY': 'SUN'
-    }
+    })
 
     def parse(self, window_str: str) -> TimeWindow:
         """
@@ -92,13 +136,17 @@ class TimeWindowParser:
         - "MON-FRI 09:00-17:00 Asia/Tokyo"
         - "SAT-SUN 00:00-06:00 UTC"
         - "SUN 23:00-06:00 America/New_York"
+
+        Results are cached per string (see parse_window); the returned
+        TimeWindow is immutable and may be shared.
         """
+        return parse_window(window_str)
+
+    def _parse(self, window_str: str) -> TimeWindow:
         if not window_str or window_str.strip() == 'never':
             raise ValueError("Invalid time window: cannot parse 'never' or empty string")
 
-        # Pattern: DAYS TIME_RANGE TIMEZONE
-        pattern = r'^([A-Z\-,\s]+)\s+(\d{2}:\d{2})-(\d{2}:\d{2})\s+([A-Za-z/_]+)$'
-        match = re.match(pattern, window_str.strip())
+        match = _WINDOW_RE.match(window_str.strip())
 
         if not match:
             raise ValueError(f"Invalid time window format: {window_str}")
@@ -110,8 +158,8 @@ class TimeWindowParser:
 
         # Validate timezone
         try:
-            pytz.timezone(timezone_str)
-        except pytz.exceptions.UnknownTimeZoneError:
+            _tz(timezone_str)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
             raise ValueError(f"Unknown timezone: {timezone_str}")
 
         # Validate time format
@@ -127,84 +175,57 @@ class TimeWindowParser:
 
     def _parse_days(self, days_str: str) -> List[str]:
         """Parse day specifications into list of day abbreviations"""
-        days = []
-
-        # Handle range format (MON-FRI)
-        if '-' in days_str and ',' not in days_str:
-            parts = days_str.split('-')
-            if len(parts) == 2:
-                start_day = parts[0].strip()
-                end_day = parts[1].strip()
-                days = self._expand_day_range(start_day, end_day)
-            else:
+        # Segments ("SUN", "MON-FRI") in one scan; dict keys dedupe while
+        # preserving order
+        days = {}
+        in_list = ',' in days_str
+        for match in _DAY_SEGMENT_RE.finditer(days_str):
+            start_day, end_day, extra = match.groups()
+            if extra is not None:
+                if in_list:
+                    raise ValueError(f"Invalid day range in list: {match.group(0).lstrip(',').strip()}")
                 raise ValueError(f"Invalid day range format: {days_str}")
+            if end_day is None:
+                days[self._normalize_day(start_day)] = None
+            else:
+                days.update(dict.fromkeys(self._expand_day_range(start_day, end_day)))
 
-        # Handle comma-separated list (MON,WED,FRI)
-        elif ',' in days_str:
-            day_parts = days_str.split(',')
-            for day_part in day_parts:
-                day_part = day_part.strip()
-                if '-' in day_part:
-                    # Handle range within comma list
-                    range_parts = day_part.split('-')
-                    if len(range_parts) == 2:
-                        range_days = self._expand_day_range(range_parts[0].strip(), range_parts[1].strip())
-                        days.extend(range_days)
-                    else:
-                        raise ValueError(f"Invalid day range in list: {day_part}")
-                else:
-                    # Single day
-                    days.append(self._normalize_day(day_part))
-
-        # Handle single day (SUN)
-        else:
-            days = [self._normalize_day(days_str)]
-
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_days = []
-        for day in days:
-            if day not in seen:
-                seen.add(day)
-                unique_days.append(day)
-
-        return unique_days
+        return list(days)
 
     def _expand_day_range(self, start_day: str, end_day: str) -> List[str]:
         """Expand day range (e.g., MON-FRI) to list of days"""
-        day_order = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+        day_order = _WEEKDAYS
 
         start_norm = self._normalize_day(start_day)
         end_norm = self._normalize_day(end_day)
 
         try:
-            start_idx = day_order.index(start_norm)
-            end_idx = day_order.index(end_norm)
-        except ValueError as e:
+            start_idx = _WEEKDAY_IDX[start_norm]
+            end_idx = _WEEKDAY_IDX[end_norm]
+        except KeyError as e:
             raise ValueError(f"Invalid day in range {start_day}-{end_day}: {e}")
 
         # Handle wrap-around (e.g., SAT-MON)
         if start_idx <= end_idx:
-            return day_order[start_idx:end_idx + 1]
+            return list(day_order[start_idx:end_idx + 1])
         else:
-            return day_order[start_idx:] + day_order[:end_idx + 1]
+            return list(day_order[start_idx:] + day_order[:end_idx + 1])
 
     def _normalize_day(self, day: str) -> str:
         """Normalize day name to standard abbreviation"""
-        day_upper = day.upper().strip()
-
-        if day_upper in self.DAY_MAPPING:
-            return self.DAY_MAPPING[day_upper]
+        normalized = self.DAY_MAPPING.get(day.upper().strip())
+        if normalized is not None:
+            return normalized
 
         raise ValueError(f"Unknown day name: {day}")
 
     def _validate_time_format(self, time_str: str) -> None:
         """Validate time format (HH:MM)"""
-        pattern = r'^([0-1]?[0-9]|2[0-3]):([0-5][0-9])$'
-        if not re.match(pattern, time_str):
+        if not _TIME_RE.match(time_str):
             raise ValueError(f"Invalid time format: {time_str}")
 
-        # Additional validation
-        hour, minute = map(int, time_str.split(':'))
-        if not (0 <= hour <= 23 and 0 <= minute <= 59):
-            raise ValueError(f"Invalid time values: {time_str}")
+
+@lru_cache(maxsize=128)
+def parse_window(window_str: str) -> TimeWindow:
+    """Parse a time window string, reusing the TimeWindow for repeats"""
+    return TimeWindowParser()._parse(window_str)
@@ -10,81 +10,75 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApprovalRequirement:
     reason: str
     severity: str
     auto_approvable: bool = False
 
 
+# Requirement per high-risk flag / capability, in reporting order. Shared
+# (immutable) instances are handed out to every caller.
+_RISK_FLAG_REQUIREMENTS = {
+    "sends": ApprovalRequirement(
+        reason="テンプレートが外部にデータを送信します",
+        severity="critical"
+    ),
+    "deletes": ApprovalRequirement(
+        reason="テンプレートがファイルやデータを削除します",
+        severity="high"
+    ),
+    "overwrites": ApprovalRequirement(
+        reason="テンプレートがファイルやデータを上書きします",
+        severity="high"
+    ),
+}
+
+_CAPABILITY_REQUIREMENTS = {
+    "system": ApprovalRequirement(
+        reason="テンプレートがシステムレベルの操作を実行します",
+        severity="critical"
+    ),
+}
+
+
 class ApprovalGateManager:
     """Manages approval gate logic for template execution"""
 
-    HIGH_RISK_FLAGS = ["sends", "deletes", "overwrites"]
-    HIGH_RISK_CAPABILITIES = ["system"]
+    HIGH_RISK_FLAGS = frozenset(_RISK_FLAG_REQUIREMENTS)
+    HIGH_RISK_CAPABILITIES = frozenset(_CAPABILITY_REQUIREMENTS)
+
+    SEVERITY_ICONS = {
+        "low": "ℹ️",
+        "medium": "⚠️",
+        "high": "🔴",
+        "critical": "🚨"
+    }
 
     def __init__(self):
         pass
 
     def requires_approval(self, manifest: Dict[str, Any]) -> bool:
         """Check if manifest requires manual approval"""
-        risk_flags = manifest.get("risk_flags", [])
-        capabilities = manifest.get("required_capabilities", [])
-
-        # Check for high-risk flags
-        for flag in risk_flags:
-            if flag in self.HIGH_RISK_FLAGS:
-                return True
-
-        # Check for high-risk capabilities
-        for capability in capabilities:
-            if capability in self.HIGH_RISK_CAPABILITIES:
-                return True
-
-        return False
+        return bool(self.get_approval_requirements(manifest))
 
     def get_approval_requirements(self, manifest: Dict[str, Any]) -> List[ApprovalRequirement]:
         """Get list of approval requirements for a manifest"""
-        requirements = []
         risk_flags = manifest.get("risk_flags", [])
         capabilities = manifest.get("required_capabilities", [])
 
-        # Check risk flags
-        if "sends" in risk_flags:
-            requirements.append(ApprovalRequirement(
-                reason="テンプレートが外部にデータを送信します",
-                severity="critical"
-            ))
-
-        if "deletes" in risk_flags:
-            requirements.append(ApprovalRequirement(
-                reason="テンプレートがファイルやデータを削除します",
-                severity="high"
-            ))
-
-        if "overwrites" in risk_flags:
-            requirements.append(ApprovalRequirement(
-                reason="テンプレートがファイルやデータを上書きします",
-                severity="high"
-            ))
-
-        # Check capabilities
-        if "system" in capabilities:
-            requirements.append(ApprovalRequirement(
-                reason="テンプレートがシステムレベルの操作を実行します",
-                severity="critical"
-            ))
-
+        requirements = [req for flag, req in _RISK_FLAG_REQUIREMENTS.items() if flag in risk_flags]
+        requirements.extend(req for cap, req in _CAPABILITY_REQUIREMENTS.items() if cap in capabilities)
         return requirements
 
     def can_auto_approve(self, manifest: Dict[str, Any], user_role: str) -> bool:
         """Check if template can be auto-approved based on user role"""
-        if not self.requires_approval(manifest):
+        requirements = self.get_approval_requirements(manifest)
+        if not requirements:
             return True
 
         # Only admins can auto-approve high-risk templates
         if user_role == "admin":
-            requirements = self.get_approval_requirements(manifest)
             # Check if all requirements are auto-approvable
             return all(req.auto_approvable for req in requirements)
 
@@ -97,25 +91,19 @@ class ApprovalGateManager:
         if not requirements:
             return "このテンプレートは自動承認されました。"
 
+        icons = self.SEVERITY_ICONS
         message_parts = ["このテンプレートは以下の理由で手動承認が必要です:", ""]
-
-        for i, req in enumerate(requirements, 1):
-            severity_icon = {
-                "low": "ℹ️",
-                "medium": "⚠️",
-                "high": "🔴",
-                "critical": "🚨"
-            }.get(req.severity, "❓")
-
-            message_parts.append(f"{i}. {severity_icon} {req.reason}")
-
+        message_parts.extend(
+            f"{i}. {icons.get(req.severity, '❓')} {req.reason}"
+            for i, req in enumerate(requirements, 1)
+        )
         message_parts.extend([
             "",
             "承認するには管理者権限が必要です。",
             "実行前にテンプレートの内容を十分に確認してください。"
         ])
 
-        return "\\n".join(message_parts)
+        return "\n".join(message_parts)
 
 
 # Global approval gate manager
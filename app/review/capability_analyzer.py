@@ -3,6 +3,7 @@ Capability Analysis for Review Screen
 Analyzes templates and provides risk/capability highlighting for review
 """
 
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -11,8 +12,15 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Ordinal ranks so the aggregation loops compare ints, mapped back to the
+# level name once at the end
+_RISK_LEVELS = ("low", "medium", "high")
+_RISK_LEVEL_ORDER = {level: i for i, level in enumerate(_RISK_LEVELS)}
+_SEVERITIES = ("low", "medium", "high", "critical")
+_SEVERITY_ORDER = {severity: i for i, severity in enumerate(_SEVERITIES)}
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class CapabilityInfo:
     name: str
     description: str
@@ -20,7 +28,7 @@ class CapabilityInfo:
     icon: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RiskInfo:
     flag: str
     description: str
@@ -32,7 +40,8 @@ class RiskInfo:
 class CapabilityAnalyzer(BaseAnalyzer):
     """Extended capability analyzer for review screen"""
 
-    CAPABILITY_INFO = {
+    # Read-only: shared by every analyzer instance
+    CAPABILITY_INFO = MappingProxyType({
         "webx": CapabilityInfo(
             name="Web拡張機能",
             description="ブラウザ操作、フォーム入力、クリック操作",
@@ -63,9 +72,9 @@ class CapabilityAnalyzer(BaseAnalyzer):
             risk_level="high",
             icon="⚙️"
         )
-    }
+    })
 
-    RISK_INFO = {
+    RISK_INFO = MappingProxyType({
         "sends": RiskInfo(
             flag="sends",
             description="外部へのデータ送信",
@@ -87,7 +96,22 @@ class CapabilityAnalyzer(BaseAnalyzer):
             icon="✏️",
             requires_approval=True
         )
+    })
+
+    # Integer level per capability / severity per risk flag, plus the flags
+    # needing approval, resolved once for the aggregation in
+    # analyze_template_for_review
+    _CAPABILITY_RANK = {
+        capability: _RISK_LEVEL_ORDER.get(info.risk_level, 0)
+        for capability, info in CAPABILITY_INFO.items()
+    }
+    _RISK_RANK = {
+        risk_flag: _SEVERITY_ORDER.get(info.severity, 0)
+        for risk_flag, info in RISK_INFO.items()
     }
+    _APPROVAL_FLAGS = frozenset(
+        risk_flag for risk_flag, info in RISK_INFO.items() if info.requires_approval
+    )
 
     def get_capability_info(self, capability: str) -> Optional[CapabilityInfo]:
         """Get detailed capability information"""
@@ -103,50 +127,38 @@ class CapabilityAnalyzer(BaseAnalyzer):
         risk_flags = self.detect_risk_flags(template_content)
         webx_urls = self.extract_webx_urls(template_content)
 
-        # Get detailed info for each capability
+        # Get detailed info for each capability / risk flag; unknown entries
+        # are skipped, highest levels tracked as integer ranks
+        capability_rank = self._CAPABILITY_RANK
+        known_capabilities = [c for c in capabilities if c in capability_rank]
         capability_details = []
-        max_capability_risk = "low"
-
-        for capability in capabilities:
-            info = self.get_capability_info(capability)
-            if info:
-                capability_details.append({
-                    "name": capability,
-                    "display_name": info.name,
-                    "description": info.description,
-                    "risk_level": info.risk_level,
-                    "icon": info.icon
-                })
-
-                # Track highest risk level
-                if info.risk_level == "high":
-                    max_capability_risk = "high"
-                elif info.risk_level == "medium" and max_capability_risk != "high":
-                    max_capability_risk = "medium"
-
-        # Get detailed info for each risk flag
+        for capability in known_capabilities:
+            info = self.CAPABILITY_INFO[capability]
+            capability_details.append({
+                "name": capability,
+                "display_name": info.name,
+                "description": info.description,
+                "risk_level": info.risk_level,
+                "icon": info.icon
+            })
+        max_capability_risk = _RISK_LEVELS[
+            max((capability_rank[c] for c in known_capabilities), default=0)]
+
+        risk_rank = self._RISK_RANK
+        known_flags = [f for f in risk_flags if f in risk_rank]
         risk_details = []
-        requires_approval = False
-        max_risk_severity = "low"
-
-        for risk_flag in risk_flags:
-            info = self.get_risk_info(risk_flag)
-            if info:
-                risk_details.append({
-                    "flag": risk_flag,
-                    "description": info.description,
-                    "severity": info.severity,
-                    "icon": info.icon,
-                    "requires_approval": info.requires_approval
-                })
-
-                if info.requires_approval:
-                    requires_approval = True
-
-                # Track highest severity
-                severity_order = {"low": 0, "medium": 1, "high": 2, "critical": 3}
-                if severity_order.get(info.severity, 0) > severity_order.get(max_risk_severity, 0):
-                    max_risk_severity = info.severity
+        for risk_flag in known_flags:
+            info = self.RISK_INFO[risk_flag]
+            risk_details.append({
+                "flag": risk_flag,
+                "description": info.description,
+                "severity": info.severity,
+                "icon": info.icon,
+                "requires_approval": info.requires_approval
+            })
+        requires_approval = not self._APPROVAL_FLAGS.isdisjoint(known_flags)
+        max_risk_severity = _SEVERITIES[
+            max((risk_rank[f] for f in known_flags), default=0)]
 
         # Overall assessment
         overall_risk = "low"
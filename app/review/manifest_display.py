@@ -3,116 +3,37 @@ Manifest Display Components for Review Screen
 Renders capability and risk information in review UI
 """
 
+from functools import lru_cache
 from typing import Dict, Any
 from ..review.capability_analyzer import CapabilityAnalyzer
 
-
-class ReviewManifestDisplay:
-    """Handles manifest information display in review screens"""
-
-    def __init__(self):
-        self.analyzer = CapabilityAnalyzer()
-
-    def render_capability_warnings(self, manifest: Dict[str, Any]) -> str:
-        """Render capability warnings HTML for review screen"""
-        capabilities = manifest.get("required_capabilities", [])
-        risk_flags = manifest.get("risk_flags", [])
-
-        html_parts = []
-
-        # Capabilities section
-        if capabilities:
-            html_parts.append('<div class="capabilities-section">')
-            html_parts.append('<h3>🔧 必要な機能・権限</h3>')
-            html_parts.append('<div class="capabilities-grid">')
-
-            for capability in capabilities:
-                info = self.analyzer.get_capability_info(capability)
-                if info:
-                    risk_class = f"capability-{info.risk_level}"
-                    html_parts.append(f'''
-                    <div class="capability-card {risk_class}">
-                        <div class="capability-icon">{info.icon}</div>
-                        <div class="capability-name">{info.name}</div>
-                        <div class="capability-id" style="display:none;">{capability}</div>
-                        <div class="capability-desc">{info.description}</div>
-                        <div class="capability-risk">リスク: {info.risk_level.upper()}</div>
-                    </div>
-                    ''')
-
-            html_parts.append('</div>')
-            html_parts.append('</div>')
-
-        # Risk flags section
-        if risk_flags:
-            html_parts.append('<div class="risk-flags-section">')
-            html_parts.append('<h3>⚠️ リスク分析</h3>')
-            html_parts.append('<div class="risk-flags-list">')
-
-            for risk_flag in risk_flags:
-                info = self.analyzer.get_risk_info(risk_flag)
-                if info:
-                    severity_class = f"risk-{info.severity}"
-                    approval_badge = "🔒 承認必須" if info.requires_approval else ""
-
-                    html_parts.append(f'''
-                    <div class="risk-flag-item {severity_class}">
-                        <div class="risk-icon">{info.icon}</div>
-                        <div class="risk-content">
-                            <div class="risk-title">{info.flag.upper()} ({risk_flag}): {info.description}</div>
-                            <div class="risk-severity">深刻度: {info.severity.upper()}</div>
-                            {f'<div class="approval-required">{approval_badge}</div>' if approval_badge else ''}
-                        </div>
-                    </div>
-                    ''')
-
-            html_parts.append('</div>')
-            html_parts.append('</div>')
-
-        return '\\n'.join(html_parts)
-
-    def render_template_analysis_summary(self, analysis: Dict[str, Any]) -> str:
-        """Render template analysis summary for review"""
-        overall_risk = analysis.get("overall_risk", "low")
-        requires_approval = analysis.get("requires_approval", False)
-
-        risk_colors = {
-            "low": "#28a745",
-            "medium": "#ffc107",
-            "high": "#dc3545"
-        }
-
-        risk_icons = {
-            "low": "✅",
-            "medium": "⚠️",
-            "high": "🚨"
-        }
-
-        color = risk_colors.get(overall_risk, "#6c757d")
-        icon = risk_icons.get(overall_risk, "❓")
-
-        html = f'''
-        <div class="analysis-summary" style="border-left: 4px solid {color};
-            padding: 1rem; background: #f8f9fa; margin-bottom: 1rem;">
-            <div class="summary-header">
-                <span class="risk-icon" style="font-size: 1.5rem;">{icon}</span>
-                <span class="risk-level" style="font-weight: 700; color: {color};">
-                    {overall_risk.upper()} リスクテンプレート
-                </span>
-            </div>
-            <div class="summary-details" style="margin-top: 0.5rem;">
-                <div>機能要求: {len(analysis.get("capabilities", []))} 項目</div>
-                <div>リスクフラグ: {len(analysis.get("risk_flags", []))} 項目</div>
-                {f'<div style="color: #dc3545; font-weight: 600;">🔒 管理者承認が必要です</div>' if requires_approval else ''}
-            </div>
-        </div>
-        '''
-
-        return html
-
-    def generate_review_css(self) -> str:
-        """Generate CSS for review display components"""
-        return '''
+# Static HTML fragments shared by every render
+_CAPABILITIES_SECTION_OPEN = (
+    '<div class="capabilities-section">'
+    '<h3>🔧 必要な機能・権限</h3>'
+    '<div class="capabilities-grid">'
+)
+_RISK_FLAGS_SECTION_OPEN = (
+    '<div class="risk-flags-section">'
+    '<h3>⚠️ リスク分析</h3>'
+    '<div class="risk-flags-list">'
+)
+_SECTION_CLOSE = '</div></div>'
+_APPROVAL_REQUIRED = '<div class="approval-required">🔒 承認必須</div>'
+
+_RISK_COLORS = {
+    "low": "#28a745",
+    "medium": "#ffc107",
+    "high": "#dc3545"
+}
+
+_RISK_ICONS = {
+    "low": "✅",
+    "medium": "⚠️",
+    "high": "🚨"
+}
+
+_REVIEW_CSS = '''
         <style>
         .capabilities-section, .risk-flags-section {
             margin: 1.5rem 0;
@@ -237,3 +158,95 @@ class ReviewManifestDisplay:
         }
         </style>
         '''
+
+
+class ReviewManifestDisplay:
+    """Handles manifest information display in review screens"""
+
+    def __init__(self):
+        self.analyzer = CapabilityAnalyzer()
+        # A card depends only on the (static) catalog entry, so each one is
+        # rendered once per display instance
+        self._capability_card = lru_cache(maxsize=128)(self._render_capability_card)
+        self._risk_card = lru_cache(maxsize=128)(self._render_risk_card)
+
+    def render_capability_warnings(self, manifest: Dict[str, Any]) -> str:
+        """Render capability warnings HTML for review screen"""
+        capabilities = manifest.get("required_capabilities", [])
+        risk_flags = manifest.get("risk_flags", [])
+
+        html_parts = []
+
+        # Capabilities section
+        if capabilities:
+            html_parts.append(_CAPABILITIES_SECTION_OPEN)
+            html_parts.extend(map(self._capability_card, capabilities))
+            html_parts.append(_SECTION_CLOSE)
+
+        # Risk flags section
+        if risk_flags:
+            html_parts.append(_RISK_FLAGS_SECTION_OPEN)
+            html_parts.extend(map(self._risk_card, risk_flags))
+            html_parts.append(_SECTION_CLOSE)
+
+        return ''.join(html_parts)
+
+    def _render_capability_card(self, capability: str) -> str:
+        info = self.analyzer.get_capability_info(capability)
+        if not info:
+            return ''
+        return ''.join((
+            '<div class="capability-card capability-', info.risk_level, '">',
+            '<div class="capability-icon">', info.icon, '</div>',
+            '<div class="capability-name">', info.name, '</div>',
+            '<div class="capability-id" style="display:none;">', capability, '</div>',
+            '<div class="capability-desc">', info.description, '</div>',
+            '<div class="capability-risk">リスク: ', info.risk_level.upper(), '</div>',
+            '</div>',
+        ))
+
+    def _render_risk_card(self, risk_flag: str) -> str:
+        info = self.analyzer.get_risk_info(risk_flag)
+        if not info:
+            return ''
+        return ''.join((
+            '<div class="risk-flag-item risk-', info.severity, '">',
+            '<div class="risk-icon">', info.icon, '</div>',
+            '<div class="risk-content">',
+            '<div class="risk-title">', info.flag.upper(), ' (', risk_flag, '): ',
+            info.description, '</div>',
+            '<div class="risk-severity">深刻度: ', info.severity.upper(), '</div>',
+            _APPROVAL_REQUIRED if info.requires_approval else '',
+            '</div></div>',
+        ))
+
+    def render_template_analysis_summary(self, analysis: Dict[str, Any]) -> str:
+        """Render template analysis summary for review"""
+        overall_risk = analysis.get("overall_risk", "low")
+        requires_approval = analysis.get("requires_approval", False)
+
+        color = _RISK_COLORS.get(overall_risk, "#6c757d")
+        icon = _RISK_ICONS.get(overall_risk, "❓")
+
+        html = f'''
+        <div class="analysis-summary" style="border-left: 4px solid {color};
+            padding: 1rem; background: #f8f9fa; margin-bottom: 1rem;">
+            <div class="summary-header">
+                <span class="risk-icon" style="font-size: 1.5rem;">{icon}</span>
+                <span class="risk-level" style="font-weight: 700; color: {color};">
+                    {overall_risk.upper()} リスクテンプレート
+                </span>
+            </div>
+            <div class="summary-details" style="margin-top: 0.5rem;">
+                <div>機能要求: {len(analysis.get("capabilities", []))} 項目</div>
+                <div>リスクフラグ: {len(analysis.get("risk_flags", []))} 項目</div>
+                {f'<div style="color: #dc3545; font-weight: 600;">🔒 管理者承認が必要です</div>' if requires_approval else ''}
+            </div>
+        </div>
+        '''
+
+        return html
+
+    def generate_review_css(self) -> str:
+        """Generate CSS for review display components"""
+        return _REVIEW_CSS
@@ -8,7 +8,7 @@ for the Verifier system and Planner L1.
 from __future__ import annotations
 
 import subprocess
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 
 
@@ -22,8 +22,9 @@ def capture_macos_screen_schema(target: str = "frontmost") -> Dict[str, Any]:
     Returns:
         Dictionary containing accessibility hierarchy
 
-    Note: This is a basic implementation. Full AX API integration would
-    require PyObjC and Cocoa/ApplicationServices frameworks.
+    Note: This is a basic implementation. Application and window titles
+    are read through PyObjC when it is installed, otherwise via AppleScript;
+    the full element tree is not traversed yet.
     """
 
     schema = {
@@ -35,34 +36,27 @@ def capture_macos_screen_schema(target: str = "frontmost") -> Dict[str, Any]:
     }
 
     try:
-        # Get basic window information using AppleScript
         if target == "frontmost":
-            script = '''
-            tell application "System Events"
-                set frontApp to name of first application process whose frontmost is true
-                set frontWindow to name of front window of application process frontApp
-                return {frontApp, frontWindow}
-            end tell
-            '''
-            result = subprocess.run(["osascript", "-e", script],
-                                    capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                parts = result.stdout.strip().split(", ")
-                if len(parts) >= 2:
-                    app_name = parts[0].strip()
-                    window_name = parts[1].strip()
-
-                    schema["elements"] = [{
-                        "role": "AXApplication",
-                        "label": app_name,
-                        "bounds": {"x": 0, "y": 0, "width": 1920, "height": 1080},  # Placeholder
-                        "children": [{
-                            "role": "AXWindow",
-                            "label": window_name,
-                            "bounds": {"x": 100, "y": 100, "width": 800, "height": 600},  # Placeholder
-                            "children": []  # Would contain detailed UI elements
-                        }]
+            # In-process AX lookup when PyObjC is installed; spawning osascript
+            # costs a process start and an AppleScript interpreter per capture
+            try:
+                names = _frontmost_names_via_pyobjc()
+            except ImportError:
+                names = _frontmost_names_via_osascript()
+
+            if names:
+                app_name, window_name = names
+                schema["elements"] = [{
+                    "role": "AXApplication",
+                    "label": app_name,
+                    "bounds": {"x": 0, "y": 0, "width": 1920, "height": 1080},  # Placeholder
+                    "children": [{
+                        "role": "AXWindow",
+                        "label": window_name,
+                        "bounds": {"x": 100, "y": 100, "width": 800, "height": 600},  # Placeholder
+                        "children": []  # Would contain detailed UI elements
                     }]
+                }]
 
         # Add implementation notes for future development
         schema["implementation_notes"] = [
@@ -80,6 +74,84 @@ def capture_macos_screen_schema(target: str = "frontmost") -> Dict[str, Any]:
     return schema
 
 
+def _frontmost_names_via_pyobjc() -> Optional[Tuple[str, str]]:
+    """
+    Read the frontmost application and window titles through the AX API.
+
+    Raises:
+        ImportError: If PyObjC is not installed
+
+    Returns:
+        (application name, window title), or None if there is no front window
+    """
+    from AppKit import NSWorkspace
+    from ApplicationServices import (
+        AXUIElementCreateApplication,
+        AXUIElementCopyAttributeValue,
+        kAXFocusedWindowAttribute,
+        kAXTitleAttribute,
+    )
+
+    front_app = NSWorkspace.sharedWorkspace().frontmostApplication()
+    if front_app is None:
+        return None
+
+    app_element = AXUIElementCreateApplication(front_app.processIdentifier())
+    error, window = AXUIElementCopyAttributeValue(app_element, kAXFocusedWindowAttribute, None)
+    if error or window is None:
+        return None
+    error, title = AXUIElementCopyAttributeValue(window, kAXTitleAttribute, None)
+    if error:
+        title = None
+
+    return str(front_app.localizedName() or ""), str(title or "")
+
+
+def _frontmost_names_via_osascript() -> Optional[Tuple[str, str]]:
+    """
+    Read the frontmost application and window titles with AppleScript.
+
+    Returns:
+        (application name, window title), or None if System Events failed
+    """
+    script = '''
+    tell application "System Events"
+        set frontApp to name of first application process whose frontmost is true
+        set frontWindow to name of front window of application process frontApp
+        return {frontApp, frontWindow}
+    end tell
+    '''
+    result = subprocess.run(["osascript", "-e", script],
+                            capture_output=True, text=True, timeout=5)
+    if result.returncode != 0:
+        return None
+    parts = result.stdout.strip().split(", ")
+    if len(parts) < 2:
+        return None
+    return parts[0].strip(), parts[1].strip()
+
+
+def _iter_elements(elements: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield elements and their descendants in document (pre-order) order.
+
+    Walks an explicit stack instead of recursing, so deep accessibility trees
+    cost no per-node call overhead and cannot hit the recursion limit.
+    """
+    stack = list(reversed(elements))
+    while stack:
+        element = stack.pop()
+        yield element
+        children = element.get("children")
+        if children:
+            stack.extend(reversed(children))
+
+
+def _element_text(element: Dict[str, Any]) -> str:
+    """Searchable text of an element: its label, else its value"""
+    return element.get("label") or element.get("value") or ""
+
+
 def find_elements_by_text(schema: Dict[str, Any], text: str, role: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Find elements in schema by text and optionally by role.
@@ -92,26 +164,11 @@ def find_elements_by_text(schema: Dict[str, Any], text: str, role: Optional[str]
     Returns:
         List of matching elements
     """
-    matches = []
-
-    def search_recursive(elements: List[Dict[str, Any]]):
-        for element in elements:
-            element_text = element.get("label", "") or element.get("value", "")
-            element_role = element.get("role", "")
-
-            # Check if element matches text and role criteria
-            text_matches = text.lower() in element_text.lower()
-            role_matches = role is None or element_role == role
-
-            if text_matches and role_matches:
-                matches.append(element)
-
-            # Recursively search children
-            if element.get("children"):
-                search_recursive(element["children"])
-
-    search_recursive(schema.get("elements", []))
-    return matches
+    text_l = text.lower()
+    return [
+        element for element in _iter_elements(schema.get("elements", []))
+        if text_l in _element_text(element).lower() and (role is None or element.get("role", "") == role)
+    ]
 
 
 def count_elements_by_criteria(schema: Dict[str, Any], text: Optional[str] = None, role: Optional[str] = None) -> int:
@@ -126,24 +183,9 @@ def count_elements_by_criteria(schema: Dict[str, Any], text: Optional[str] = Non
     Returns:
         Count of matching elements
     """
-    count = 0
-
-    def count_recursive(elements: List[Dict[str, Any]]):
-        nonlocal count
-        for element in elements:
-            element_text = element.get("label", "") or element.get("value", "")
-            element_role = element.get("role", "")
-
-            # Check if element matches criteria
-            text_matches = text is None or text.lower() in element_text.lower()
-            role_matches = role is None or element_role == role
-
-            if text_matches and role_matches:
-                count += 1
-
-            # Recursively count children
-            if element.get("children"):
-                count_recursive(element["children"])
-
-    count_recursive(schema.get("elements", []))
-    return count
+    text_l = text.lower() if text is not None else None
+    return sum(
+        1 for element in _iter_elements(schema.get("elements", []))
+        if (text_l is None or text_l in _element_text(element).lower())
+        and (role is None or element.get("role", "") == role)
+    )
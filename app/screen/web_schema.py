@@ -10,6 +10,8 @@ from __future__ import annotations
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .schema import _element_text, _iter_elements
+
 
 def capture_web_screen_schema(page_context, target: str = "page") -> Dict[str, Any]:
     """
@@ -78,29 +80,44 @@ def _convert_ax_node_to_element(ax_node: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Element in our schema format
     """
-    element = {
-        "role": ax_node.get("role", ""),
-        "label": ax_node.get("name", ""),
-        "value": ax_node.get("value", ""),
-    }
-
-    # Add bounds if available
-    if "boundingBox" in ax_node:
-        bbox = ax_node["boundingBox"]
-        element["bounds"] = {
-            "x": bbox.get("x", 0),
-            "y": bbox.get("y", 0),
-            "width": bbox.get("width", 0),
-            "height": bbox.get("height", 0)
-        }
-
-    # Recursively convert children
-    children = []
-    for child in ax_node.get("children", []):
-        children.append(_convert_ax_node_to_element(child))
-    element["children"] = children
-
-    return element
+    # Explicit work stack of (parent's children list, AX node) so wide or deep
+    # trees are rebuilt in a single frame
+    converted: List[Dict[str, Any]] = []
+    stack = [(converted, ax_node)]
+    while stack:
+        siblings, node = stack.pop()
+        # Each element is built as one literal; "bounds" is only present when
+        # Playwright reported a bounding box
+        children: List[Dict[str, Any]] = []
+        bbox = node.get("boundingBox")
+        if bbox is None:
+            element = {
+                "role": node.get("role", ""),
+                "label": node.get("name", ""),
+                "value": node.get("value", ""),
+                "children": children,
+            }
+        else:
+            element = {
+                "role": node.get("role", ""),
+                "label": node.get("name", ""),
+                "value": node.get("value", ""),
+                "bounds": {
+                    "x": bbox.get("x", 0),
+                    "y": bbox.get("y", 0),
+                    "width": bbox.get("width", 0),
+                    "height": bbox.get("height", 0)
+                },
+                "children": children,
+            }
+        siblings.append(element)
+
+        # Reversed so children are popped, and appended, in document order
+        ax_children = node.get("children")
+        if ax_children:
+            stack.extend((children, child) for child in reversed(ax_children))
+
+    return converted[0]
 
 
 def find_web_elements_by_text(schema: Dict[str, Any], text: str, role: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -115,29 +132,13 @@ def find_web_elements_by_text(schema: Dict[str, Any], text: str, role: Optional[
     Returns:
         List of matching elements
     """
-    matches = []
-
-    def search_recursive(elements: List[Dict[str, Any]]):
-        for element in elements:
-            element_text = element.get("label", "") or element.get("value", "")
-            element_role = element.get("role", "").lower()
-
-            # Normalize role for comparison
-            role_normalized = role.lower() if role else None
-
-            # Check if element matches text and role criteria
-            text_matches = text.lower() in element_text.lower()
-            role_matches = role_normalized is None or element_role == role_normalized
-
-            if text_matches and role_matches:
-                matches.append(element)
-
-            # Recursively search children
-            if element.get("children"):
-                search_recursive(element["children"])
-
-    search_recursive(schema.get("elements", []))
-    return matches
+    text_l = text.lower()
+    role_l = role.lower() if role else None
+    return [
+        element for element in _iter_elements(schema.get("elements", []))
+        if text_l in _element_text(element).lower()
+        and (role_l is None or element.get("role", "").lower() == role_l)
+    ]
 
 
 def count_web_elements_by_criteria(
@@ -154,27 +155,10 @@ def count_web_elements_by_criteria(
     Returns:
         Count of matching elements
     """
-    count = 0
-
-    def count_recursive(elements: List[Dict[str, Any]]):
-        nonlocal count
-        for element in elements:
-            element_text = element.get("label", "") or element.get("value", "")
-            element_role = element.get("role", "").lower()
-
-            # Normalize role for comparison
-            role_normalized = role.lower() if role else None
-
-            # Check if element matches criteria
-            text_matches = text is None or text.lower() in element_text.lower()
-            role_matches = role_normalized is None or element_role == role_normalized
-
-            if text_matches and role_matches:
-                count += 1
-
-            # Recursively count children
-            if element.get("children"):
-                count_recursive(element["children"])
-
-    count_recursive(schema.get("elements", []))
-    return count
+    text_l = text.lower() if text is not None else None
+    role_l = role.lower() if role else None
+    return sum(
+        1 for element in _iter_elements(schema.get("elements", []))
+        if (text_l is None or text_l in _element_text(element).lower())
+        and (role_l is None or element.get("role", "").lower() == role_l)
+    )
@@ -1,17 +1,69 @@
+"""PII masking helpers.
+
+Note: this module is shadowed by the ``app.security`` package, so
+``from app.security import mask`` does not reach it.
+"""
+
 import re
+from functools import lru_cache
 
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-PATH_RE = re.compile(r"(/[^\s]+)+")
+PATH_RE = re.compile(r"/\S+")
 NAME_RE = re.compile(r"\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b")
 PHONE_RE = re.compile(r"\b(?:\+?\d[\d\-\s]{7,}\d)\b")
 
+# All patterns as one alternation so mask() scans the text once. A single pass
+# matches leftmost-first, so the output can differ from the old
+# email -> name -> path -> phone passes; the branches carry guards so that
+# text an earlier pass would have masked is not claimed by a later kind:
+# - digits glued onto an address are still masked as a phone number
+# - a name or phone number that runs into an email address yields to the email
+# - a path stops before a name instead of swallowing its first word
+_BEFORE_EMAIL = r"(?![A-Za-z0-9._%+-]*@[A-Za-z0-9.-]+\.[A-Za-z]{2,})"
+_NAME_PATTERN = rf"{NAME_RE.pattern}{_BEFORE_EMAIL}"
+_MASK_RE = re.compile(
+    rf"(?P<email>{EMAIL_RE.pattern})(?:(?P<email_phone>\d[\d\-\s]{{7,}}\d)\b{_BEFORE_EMAIL})?"
+    rf"|(?P<name>{_NAME_PATTERN})"
+    rf"|(?P<path>/(?:(?!{_NAME_PATTERN})\S)+)"
+    rf"|(?P<phone>{PHONE_RE.pattern}{_BEFORE_EMAIL})"
+)
+_DIGIT_RE = re.compile(r"\d")
+_REPLACEMENTS = {
+    # Replace entire email with a generic token (no @ remains)
+    "email": "***",
+    "email_phone": "******-***-****",
+    "name": "*** **",
+    "path": "/…/…",
+    "phone": "***-***-****",
+}
+
+
+def _replace(match: re.Match) -> str:
+    return _REPLACEMENTS[match.lastgroup]
+
+
+# Log pipelines mask the same lines over and over; very long strings are
+# rare and would only crowd the cache
+_MASK_CACHE_MAX_LEN = 1024
+
 
 def mask(text: str) -> str:
     if not text:
         return text
-    # Replace entire email with a generic token (no @ remains)
-    t = EMAIL_RE.sub("***", text)
-    t = NAME_RE.sub("*** **", t)
-    t = PATH_RE.sub("/…/…", t)
-    t = PHONE_RE.sub("***-***-****", t)
-    return t
+    if len(text) > _MASK_CACHE_MAX_LEN:
+        return _mask(text)
+    return _mask_cached(text)
+
+
+def _mask(text: str) -> str:
+    # Emails, paths and phones all need an "@", "/" or digit; without any of
+    # them only a name can match, so skip the combined scan
+    if "@" not in text and "/" not in text and not _DIGIT_RE.search(text):
+        # A name is two words of at least two letters split by whitespace
+        if len(text) < 5 or len(text.split(None, 1)) < 2:
+            return text
+        return NAME_RE.sub("*** **", text)
+    return _MASK_RE.sub(_replace, text)
+
+
+_mask_cached = lru_cache(maxsize=4096)(_mask)
@@ -6,6 +6,7 @@ Enforces security policies for template execution, signature verification, and W
 import yaml
 import hashlib
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
@@ -489,16 +490,25 @@ class PolicyEngine:
             return {"error": str(e)}
 
 
-# Global policy engine instance
-_policy_engine: Optional[PolicyEngine] = None
+# Global policy engine instances, one per config directory
+_policy_engines: Dict[Path, PolicyEngine] = {}
+_policy_engines_lock = threading.Lock()
 
 
-def get_policy_engine() -> PolicyEngine:
-    """Get the global policy engine instance"""
-    global _policy_engine
-    if _policy_engine is None:
-        _policy_engine = PolicyEngine()
-    return _policy_engine
+def get_policy_engine(config_dir: Optional[Path] = None) -> PolicyEngine:
+    """Get the global policy engine instance for a config directory.
+
+    Lookups after the first are a plain dict read; the lock only serializes
+    first-time construction so configs are never loaded twice.
+    """
+    key = Path(config_dir) if config_dir is not None else Path("configs")
+    engine = _policy_engines.get(key)
+    if engine is None:
+        with _policy_engines_lock:
+            engine = _policy_engines.get(key)
+            if engine is None:
+                engine = _policy_engines[key] = PolicyEngine(key)
+    return engine
 
 
 def verify_template_before_execution(template_path: Path) -> Tuple[bool, PolicyDecision]:
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timezone
+
+from app.policy.execution_guard import _domain_allowed, _in_time_window, check_pre_execution
+
+
+def test_domain_allowed_matches_hostnames_by_label():
+    allow = ['partner.example.com']
+    assert _domain_allowed(['https://partner.example.com:8443/form'] * 3, allow)
+    assert _domain_allowed(['https://user@api.partner.example.com/'], allow)
+    assert not _domain_allowed(['https://evilpartner.example.com/'], allow)
+    assert _domain_allowed([], allow)
+    assert _domain_allowed(['https://anything.test/'], [])
+
+
+def test_in_time_window_uses_policy_timezone():
+    window = 'SUN 00:00-06:00 Asia/Tokyo'
+    assert _in_time_window(window, datetime(2024, 8, 17, 16, 30, tzinfo=timezone.utc))  # SUN 01:30 JST
+    assert not _in_time_window(window, datetime(2024, 8, 17, 12, 30, tzinfo=timezone.utc))  # SAT 21:30 JST
+    # Malformed windows are permissive
+    assert _in_time_window('SUN 00:00-06:00 Not/AZone')
+    assert _in_time_window('SUN')
+
+
+def test_check_pre_execution_blocks_and_audits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    policy = {
+        'allow_domains': ['partner.example.com'],
+        'allow_risks': ['sends'],
+        'require_signed_templates': True,
+    }
+    manifest = {'risk_flags': ['sends'], 'signature_verified': True}
+
+    ok = check_pre_execution(manifest, ['https://partner.example.com/a'], policy)
+    assert ok.allowed is True
+    assert not (tmp_path / 'logs' / 'policy_audit.log').exists()
+
+    blocked = check_pre_execution(manifest, ['https://evil.example.com/a'], policy)
+    assert blocked.allowed is False
+    assert blocked.checks['allow_domains']['passed'] is False
+    assert (tmp_path / 'logs' / 'policy_audit.log').read_text(encoding='utf-8').count('\n') == 1
+
+
+def test_policy_audit_reuses_open_log_handle(tmp_path, monkeypatch):
+    from app.policy import execution_guard
+
+    monkeypatch.chdir(tmp_path)
+    execution_guard._write_policy_audit('block', ['r1'], {}, {'b': 1, 'a': 2}, [])
+    handle = execution_guard._audit_fh
+    execution_guard._write_policy_audit('block', ['r2'], {}, {}, ['https://x.test/'])
+    assert execution_guard._audit_fh is handle
+
+    lines = (tmp_path / 'logs' / 'policy_audit.log').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first['manifest_keys'] == ['a', 'b']
+    assert first['ts'].endswith('Z')
+    assert json.loads(lines[1])['urls'] == ['https://x.test/']
+
+    execution_guard._close_audit_file()
+    assert execution_guard._audit_fh is None
+
+
+def test_audit_lines_match_with_and_without_orjson(monkeypatch):
+    from app.policy import execution_guard
+
+    record = {'ts': '2024-01-01T00:00:00Z', 'reasons': ['東京'], 'checks': {'a': {'passed': False}}}
+    fast = execution_guard._dumps_line(record)
+    monkeypatch.setattr(execution_guard, 'orjson', None)
+    slow = execution_guard._dumps_line(record)
+    assert fast.endswith(b'\n') and slow.endswith(b'\n')
+    assert json.loads(fast) == json.loads(slow) == record
+
+
+def test_policy_block_metrics_use_cached_collector(tmp_path, monkeypatch):
+    from unittest.mock import MagicMock
+    from app.policy import execution_guard
+
+    monkeypatch.chdir(tmp_path)
+    collector = MagicMock()
+    factory = MagicMock(return_value=collector)
+    monkeypatch.setattr(execution_guard, '_metrics_collector', None)
+    monkeypatch.setattr(execution_guard, 'get_metrics_collector', factory)
+
+    policy = {'allow_domains': ['partner.example.com']}
+    for _ in range(3):
+        assert not check_pre_execution({}, ['https://evil.example.com/'], policy).allowed
+
+    assert factory.call_count == 1
+    assert collector.mark_policy_block.call_count == 3
+    execution_guard._close_audit_file()
@@ -130,6 +130,34 @@ steps:
         assert "deletes" in risk_flags   # delete_file
         assert "overwrites" in risk_flags # overwrite_file
 
+    def test_review_analysis_returns_plain_serializable_details(self):
+        """Review details are plain dicts that callers can extend or serialize"""
+        import json
+
+        analyzer = CapabilityAnalyzer()
+
+        template_content = """
+steps:
+  - open_browser:
+      url: "https://example.com"
+  - delete_file:
+      file_path: "old.txt"
+"""
+
+        first = analyzer.analyze_template_for_review(template_content)
+        webx = next(d for d in first["capability_details"] if d["name"] == "webx")
+        assert webx["display_name"] == "Web拡張機能"
+        assert first["max_risk_severity"] == "high"
+        assert first["overall_risk"] == "high"
+        assert json.loads(json.dumps(first))["risk_details"][0]["flag"] == "deletes"
+
+        # Editing one result does not leak into the next
+        webx["icon"] = "x"
+        first["risk_details"][0]["note"] = "checked"
+        second = analyzer.analyze_template_for_review(template_content)
+        assert next(d for d in second["capability_details"] if d["name"] == "webx")["icon"] == "🌐"
+        assert "note" not in second["risk_details"][0]
+
     def test_capability_requirement_validation(self):
         """Should validate that template actions match declared capabilities"""
         # RED: Will fail - validation logic not implemented
@@ -204,6 +232,26 @@ class TestReviewScreenIntegration:
         # Low risk should auto-approve
         assert gate_manager.requires_approval(low_risk_manifest) is False
 
+    def test_approval_requirements_in_fixed_order(self):
+        """Requirements follow sends/deletes/overwrites/system order, once each"""
+        from app.review.approval_gate import ApprovalGateManager
+
+        gate_manager = ApprovalGateManager()
+        manifest = {
+            "risk_flags": ["overwrites", "sends", "sends"],
+            "required_capabilities": ["webx", "system"]
+        }
+
+        requirements = gate_manager.get_approval_requirements(manifest)
+        assert [req.severity for req in requirements] == ["critical", "high", "critical"]
+        assert "送信" in requirements[0].reason
+        assert gate_manager.get_approval_requirements(manifest)[0] is requirements[0]
+        assert gate_manager.get_approval_requirements({"risk_flags": ["reads"]}) == []
+
+        lines = gate_manager.create_approval_message({"risk_flags": ["deletes"]}).splitlines()
+        assert lines[2] == "1. 🔴 テンプレートがファイルやデータを削除します"
+        assert len(lines) == 6
+
     def test_manifest_display_in_run_detail(self):
         """Run detail page should show manifest info for executed templates"""
         # RED: Will fail - run detail integration not implemented
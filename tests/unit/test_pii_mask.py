@@ -0,0 +1,60 @@
+import importlib.util
+from pathlib import Path
+
+# app/security.py is shadowed by the app.security package, so load it by path
+_spec = importlib.util.spec_from_file_location(
+    'app_security_mask', Path(__file__).resolve().parents[2] / 'app' / 'security.py'
+)
+security = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(security)
+
+
+def test_mask_replaces_each_kind_in_one_pass():
+    text = 'Contact John Doe at john.doe@example.com or +1-202-555-0123. File at /Users/john/secret/report.pdf'
+    assert security.mask(text) == '*** ** Doe at *** or +***-***-****. File at /…/…'
+    assert security.mask('') == ''
+    assert security.mask('nothing to hide') == 'nothing to hide'
+
+
+def test_mask_masks_no_less_than_separate_passes():
+    # A path does not swallow the first word of a name
+    assert 'Doe' not in security.mask('/Users/John Doe/x')
+    # A name running into an address yields to the email
+    assert security.mask('Mary Ann@example.com') == 'Mary ***'
+    # Digits glued onto an address are still masked
+    assert security.mask('a@b.co555 1234 567') == '******-***-****'
+    # A phone number running into an address yields to the email
+    assert security.mask('sms 1 800 5551234@txt.att.net') == 'sms 1 800 ***'
+    assert security.mask('ref 2024 00012345@corp-mail.example.com') == 'ref 2024 ***'
+    assert security.mask('555 1234 567@Doe.MaryA555 1234 567 ') == '555 1234 ******-***-**** '
+    assert security.mask('a@b.com99 5551234@txt.att.net') == '***99 ***'
+    # Layout differs from the separate passes (which gave '/…/… **' and
+    # '555 ***+***-***-****'), but nothing they masked is exposed
+    assert security.mask('/Users/John John') == '/…/…*** **'
+    assert security.mask('555 a@b.co+1-202-555-0123') == '555 ******-***-****'
+
+
+def test_mask_fast_path_only_masks_names():
+    assert security.mask('Error raised by Jane Smith while saving') == 'Error raised by *** ** while saving'
+    assert security.mask('x' * 5000) == 'x' * 5000
+    assert security.mask('JohnDoe') == 'JohnDoe'
+    assert security.mask('\tJane\u00a0Smith\n') == '\t*** **\n'
+
+
+def test_path_pattern_is_flat_and_masks_long_paths():
+    deep = '/a' * 1000
+    assert security.PATH_RE.fullmatch(deep)
+    assert security.PATH_RE.sub('/…/…', f'{deep}/ end {deep} ') == '/…/… end /…/… '
+    assert security.mask(f'see {deep}.txt now') == 'see /…/… now'
+
+
+def test_mask_caches_short_lines_only():
+    security._mask_cached.cache_clear()
+    line = 'Upload failed for jane@example.com'
+    assert security.mask(line) == security.mask(line) == 'Upload failed for ***'
+    info = security._mask_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+    long_line = line + ' ' * security._MASK_CACHE_MAX_LEN
+    assert security.mask(long_line).startswith('Upload failed for ***')
+    assert security._mask_cached.cache_info().currsize == 1
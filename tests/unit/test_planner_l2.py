@@ -36,3 +36,27 @@ def test_dont_adopt_when_confidence_low():
     patch = {'replace_text': [{'find': '送信', 'with': '提出', 'role': 'button', 'confidence': 0.8}]}
     policy = {'low_risk_auto': True, 'min_confidence': 0.85}
     assert should_adopt_patch(patch, policy) is False
+
+
+def test_collect_labels_preserves_document_order():
+    from app.planner.l2 import _collect_labels
+    schema = {
+        "elements": [
+            {"label": "a", "children": [
+                {"text": "b", "children": [{"label": "c"}]},
+                {"label": "d"},
+            ]},
+            "not-a-node",
+            {"label": "e"},
+        ]
+    }
+    assert _collect_labels(schema) == ["a", "b", "c", "d", "e"]
+
+
+def test_propose_patches_sees_in_place_label_edits():
+    schema = {"elements": [{"label": "Cancel"}]}
+    assert "fallback_search" in propose_patches(schema, {"goal": "送信"})
+
+    schema["elements"][0]["label"] = "提出"
+    patches = propose_patches(schema, {"goal": "送信"})
+    assert patches["replace_text"][0]["with"] == "提出"
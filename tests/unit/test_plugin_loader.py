@@ -83,6 +83,288 @@ def steal_sensitive_data():
             assert "malicious_plugin" not in loaded
             assert loaded == {}
 
+    def test_reload_reuses_unchanged_plugin(self):
+        """Unchanged plugin files should not be recompiled or re-executed"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            plugin_file = plugin_dir / "file_utils.py"
+            plugin_file.write_text("""
+def register(actions_registry):
+    actions_registry.register('touch', touch)
+
+def touch():
+    return {"success": True}
+""")
+            loader.set_plugin_allowlist(["file_utils"])
+
+            first = loader._load_single_plugin(plugin_file)
+            assert loader._load_single_plugin(plugin_file) is first
+
+            plugin_file.write_text(plugin_file.read_text() + """
+def noop():
+    \"\"\"Do nothing\"\"\"
+    return None
+""")
+            second = loader._load_single_plugin(plugin_file)
+            assert second is not first
+            assert set(second.actions) == {"touch"}
+
+    def test_directory_load_cached_until_directory_changes(self):
+        """Repeated loads of an unchanged directory should return the cached result"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "file_utils.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('touch', lambda: {"success": True})
+""")
+            loader.set_plugin_allowlist(["file_utils"])
+
+            first = loader.load_plugins_from_directory(plugin_dir)
+            assert loader.load_plugins_from_directory(plugin_dir) is first
+
+            (plugin_dir / "data_processing.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('summarize', lambda: {"success": True})
+""")
+            loader.set_plugin_allowlist(["file_utils", "data_processing"])
+            second = loader.load_plugins_from_directory(plugin_dir)
+            assert set(second) == {"file_utils", "data_processing"}
+
+    def test_cached_directory_load_reregisters_its_actions(self):
+        """Reloading an unchanged directory makes its actions active again"""
+        loader = PluginLoader()
+        loader.set_plugin_allowlist(["data_processing"])
+
+        with tempfile.TemporaryDirectory() as dir1, tempfile.TemporaryDirectory() as dir2:
+            for plugin_dir, result in ((dir1, "first"), (dir2, "second")):
+                (Path(plugin_dir) / "data_processing.py").write_text(f"""
+def register(actions_registry):
+    actions_registry.register('which', which, fast=True)
+
+def which():
+    \"\"\"Report the {result} directory\"\"\"
+    return {result!r}
+""")
+
+            loader.load_plugins_from_directory(Path(dir1))
+            loader.load_plugins_from_directory(Path(dir2))
+            assert loader.execute_action("which") == "second"
+            assert loader.get_available_actions()["which"] == "Report the second directory"
+
+            loader.load_plugins_from_directory(Path(dir1))
+            assert loader.execute_action("which") == "first"
+            assert loader.loaded_plugins["data_processing"].path == Path(dir1) / "data_processing.py"
+            assert loader.get_available_actions()["which"] == "Report the first directory"
+
+    def test_loaded_plugins_view_materializes_plugin_dicts(self):
+        """Load results are a read-only mapping of per-plugin dicts"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            plugin_file = plugin_dir / "file_utils.py"
+            plugin_file.write_text("""
+__version__ = "2.0.0"
+
+def register(actions_registry):
+    actions_registry.register('touch', lambda: {"success": True})
+""")
+            loader.set_plugin_allowlist(["file_utils"])
+            loaded = loader.load_plugins_from_directory(plugin_dir)
+
+            assert len(loaded) == 1
+            assert "file_utils" in loaded and "missing" not in loaded
+            entry = loaded["file_utils"]
+            assert entry["name"] == "file_utils"
+            assert entry["path"] == str(plugin_file)
+            assert set(entry["actions"]) == {"touch"}
+            assert entry["metadata"]["version"] == "2.0.0"
+            assert dict(loaded) == {"file_utils": entry}
+            with pytest.raises(TypeError):
+                loaded["other"] = {}
+
+    def test_concurrent_load_reports_failing_plugin(self):
+        """Plugins load in parallel but a failure is still attributed to its plugin"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "clipboard_actions.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('copy', lambda: {"success": True})
+""")
+            (plugin_dir / "file_utils.py").write_text("VALUE = 1\n")
+            loader.set_plugin_allowlist(["clipboard_actions", "file_utils"])
+
+            with pytest.raises(PluginSecurityError, match="Failed to load plugin file_utils"):
+                loader.load_plugins_from_directory(plugin_dir)
+
+            # Plugins ahead of the failure are still registered
+            assert "copy" in loader.actions_registry
+
+    def test_plugins_after_failing_plugin_are_not_executed(self):
+        """A load failure stops before any later plugin's code runs"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "clipboard_actions.py").write_text("VALUE = 1\n")
+            for plugin_name in ("data_processing", "file_utils"):
+                (plugin_dir / f"{plugin_name}.py").write_text(f"""
+import os
+os.environ['PLUGIN_LOADED_{plugin_name.upper()}'] = '1'
+
+def register(actions_registry):
+    actions_registry.register('{plugin_name}_noop', lambda: None)
+""")
+            loader.set_plugin_allowlist(["clipboard_actions", "data_processing", "file_utils"])
+
+            with patch.dict(os.environ):
+                with pytest.raises(PluginSecurityError, match="Failed to load plugin clipboard_actions"):
+                    loader.load_plugins_from_directory(plugin_dir)
+                assert "PLUGIN_LOADED_DATA_PROCESSING" not in os.environ
+                assert "PLUGIN_LOADED_FILE_UTILS" not in os.environ
+
+            assert not loader.loaded_plugins
+
+    def test_validate_plugin_code_denies_dangerous_substrings(self):
+        """Hard-deny tokens must also catch longer names built on them"""
+        loader = PluginLoader()
+
+        loader._validate_plugin_code("def copy_step():\n    return compute()\n", "file_utils")
+
+        with pytest.raises(PluginSecurityError, match="dangerous function: exec"):
+            loader._validate_plugin_code("exec('print(1)')", "file_utils")
+        with pytest.raises(PluginSecurityError, match="dangerous function: exec"):
+            loader._validate_plugin_code('import os\nos.execvp("sh", ["sh"])\n', "file_utils")
+        with pytest.raises(PluginSecurityError, match="dangerous function: subprocess"):
+            loader._validate_plugin_code("import _posixsubprocess\n", "file_utils")
+        # A denied token overlapping another token must still be seen
+        with pytest.raises(PluginSecurityError, match="dangerous function: subprocess"):
+            loader._validate_plugin_code('m = __import__("requestsubprocess"[7:])\n', "file_utils")
+        with pytest.raises(PluginSecurityError, match="system directories"):
+            loader._validate_plugin_code("open('/etc/hosts')", "file_utils")
+
+    def test_validate_plugin_code_prefilter_covers_all_tokens(self):
+        """Mixed-case dangerous tokens must still reach the full regex check"""
+        loader = PluginLoader()
+
+        with pytest.raises(PluginSecurityError, match="dangerous function: os.system"):
+            loader._validate_plugin_code("OS.System('ls')", "file_utils")
+        with pytest.raises(PluginSecurityError, match="dangerous function: subprocess"):
+            loader._validate_plugin_code("import SubProcess", "file_utils")
+        with patch("app.plugins.loader.logger") as mock_logger:
+            loader._validate_plugin_code("x = Sys.Modules", "file_utils")
+            mock_logger.warning.assert_called_once()
+
+    def test_available_actions_refresh_after_load(self):
+        """Action descriptions should be cached and rebuilt after new loads"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "file_utils.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('touch', touch)
+
+def touch():
+    \"\"\"Create an empty file\"\"\"
+    return {"success": True}
+""")
+            loader.set_plugin_allowlist(["file_utils", "data_processing"])
+            loader.load_plugins_from_directory(plugin_dir)
+
+            actions = loader.get_available_actions()
+            assert actions == {"touch": "Create an empty file"}
+            assert loader.get_available_actions() is actions
+
+            (plugin_dir / "data_processing.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('summarize', lambda: {"success": True})
+""")
+            loader.load_plugins_from_directory(plugin_dir)
+            assert loader.get_available_actions() == {
+                "touch": "Create an empty file",
+                "summarize": "No description available",
+            }
+
+            # actions_registry is a read-only view of the same table
+            registry = loader.actions_registry
+            assert sorted(registry) == ["summarize", "touch"]
+            assert registry["touch"]() == {"success": True}
+            with pytest.raises(TypeError):
+                registry["other"] = len
+
+    def test_execute_action_uses_registered_function(self):
+        """execute_action should dispatch straight to the registered action"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "data_processing.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('double', double)
+
+def double(value):
+    return value * 2
+""")
+            loader.set_plugin_allowlist(["data_processing"])
+            loader.load_plugins_from_directory(plugin_dir)
+
+            assert loader.execute_action("double", 21) == 42
+            with pytest.raises(PluginSecurityError, match="Action not found"):
+                loader.execute_action("missing")
+
+    def test_fast_actions_skip_sandbox_timer(self):
+        """Actions registered as fast run directly; others go through the sandbox"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "data_processing.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('double', double, fast=True)
+    actions_registry.register('triple', triple)
+
+def double(value):
+    return value * 2
+
+def triple(value):
+    return value * 3
+""")
+            loader.set_plugin_allowlist(["data_processing"])
+            loader.load_plugins_from_directory(plugin_dir)
+
+            assert loader.fast_actions == {"double"}
+            with patch.object(PluginSandbox, "_call_with_timeout", autospec=True,
+                              side_effect=lambda self, f, a, k: f(*a, **k)) as mock_call:
+                assert loader.execute_action("double", 2) == 4
+                mock_call.assert_not_called()
+                assert loader.execute_action("triple", 2) == 6
+                mock_call.assert_called_once()
+
+    def test_execute_action_reuses_one_sandbox(self):
+        """The loader should build its sandbox once, not per action call"""
+        loader = PluginLoader()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plugin_dir = Path(temp_dir)
+            (plugin_dir / "data_processing.py").write_text("""
+def register(actions_registry):
+    actions_registry.register('triple', lambda value: value * 3)
+""")
+            loader.set_plugin_allowlist(["data_processing"])
+            loader.load_plugins_from_directory(plugin_dir)
+
+            with patch("app.plugins.loader.PluginSandbox", wraps=PluginSandbox) as mock_sandbox:
+                assert loader.execute_action("triple", 1) == 3
+                assert loader.execute_action("triple", 2) == 6
+                assert mock_sandbox.call_count == 1
+
     def test_plugin_sandbox_network_restriction(self):
         """Should prevent plugins from making network requests"""
         # RED: Will fail - sandbox network blocking not implemented
@@ -135,6 +417,50 @@ def write_to_system():
 
         assert "file access denied" in str(exc.value).lower()
 
+    def test_sandbox_open_normalizes_paths(self):
+        """Relative paths resolve inside the sandbox and '..' cannot escape it"""
+        sandbox = PluginSandbox()
+
+        plugin_code = """
+def write_relative():
+    with open("relative_test.txt", "w") as f:
+        f.write("ok")
+    return {"success": True}
+
+def escape():
+    with open("../PluginsWork_escape.txt", "w") as f:
+        f.write("escaped")
+    return {"success": True}
+"""
+        target = sandbox.sandbox_dir / "relative_test.txt"
+        try:
+            result = sandbox.execute_plugin_function(plugin_code, "write_relative", [])
+            assert result["success"] is True
+            assert target.read_text() == "ok"
+        finally:
+            target.unlink(missing_ok=True)
+
+        with pytest.raises(SandboxViolationError, match="File access denied"):
+            sandbox.execute_plugin_function(plugin_code, "escape", [])
+        assert not (sandbox.sandbox_dir.parent / "PluginsWork_escape.txt").exists()
+
+    def test_sandbox_reuses_compiled_code_with_fresh_globals(self):
+        """Repeat executions skip compile but never share plugin globals"""
+        sandbox = PluginSandbox()
+
+        plugin_code = """
+def tamper():
+    __builtins__["len"] = None
+    return True
+
+def measure():
+    return len("abc")
+"""
+        with patch("builtins.compile", wraps=compile) as mock_compile:
+            assert sandbox.execute_plugin_function(plugin_code, "tamper", []) is True
+            assert sandbox.execute_plugin_function(plugin_code, "measure", []) == 3
+            assert mock_compile.call_count == 1
+
     def test_plugin_execution_timeout(self):
         """Should timeout plugin execution after configured limit"""
         # RED: Will fail - timeout mechanism not implemented
@@ -152,6 +478,26 @@ def infinite_loop():
 
         assert "timeout" in str(exc.value).lower()
 
+    def test_plugin_execution_timeout_off_main_thread(self):
+        """Timeouts should also apply to concurrent calls on worker threads"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        sandbox = PluginSandbox(timeout_seconds=1)
+
+        def spin():
+            while True:
+                pass
+
+        def run():
+            with pytest.raises(SandboxViolationError) as exc:
+                sandbox.execute_plugin_function_obj(spin, (), {})
+            return str(exc.value)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            messages = list(pool.map(lambda _: run(), range(2)))
+
+        assert all("timeout" in m.lower() for m in messages)
+
     def test_plugin_environment_variable_whitelist(self):
         """Should only allow access to whitelisted environment variables"""
         # RED: Will fail - env var filtering not implemented
@@ -178,6 +524,33 @@ def access_env():
         # SECRET_API_KEY should be blocked
         assert result["secret"] == "blocked"
 
+    def test_filtered_environ_refreshes_on_allowlist_change(self):
+        """Filtered environ is a read-only snapshot rebuilt when allowed vars change"""
+        sandbox = PluginSandbox()
+        env = {"HOME": "/home/test", "SECRET_API_KEY": "s3cret"}
+
+        with patch.dict(os.environ, env):
+            sandbox.set_allowed_env_vars(["HOME"])
+            filtered = sandbox._filtered_os.environ
+            assert dict(filtered) == {"HOME": "/home/test"}
+            with pytest.raises(TypeError):
+                filtered["SECRET_API_KEY"] = "x"
+
+            sandbox.set_allowed_env_vars(["SECRET_API_KEY"])
+            assert dict(sandbox._filtered_os.environ) == {"SECRET_API_KEY": "s3cret"}
+
+    def test_filtered_os_path_proxy(self):
+        """os.path inside the sandbox delegates to the real module but remaps ~"""
+        sandbox = PluginSandbox()
+        path = sandbox._filtered_os.path
+
+        assert path is sandbox._filtered_os.path
+        assert path.join("a", "b") == os.path.join("a", "b")
+        assert path.basename("/x/y.txt") == "y.txt"
+        assert path.expanduser("~/notes.txt") == str(sandbox.sandbox_dir / "notes.txt")
+        # Module globals of os.path (e.g. the real os) are not exposed
+        assert not hasattr(path, "os")
+
 
 class TestClipboardActionsPlugin:
     """Test the example clipboard_actions.py plugin"""
@@ -56,3 +56,132 @@ require_capabilities: ["webx"]
     assert decision.allowed is True
     assert decision.autopilot is True
 
+
+def test_from_file_reuses_parsed_config_until_file_changes(tmp_path, monkeypatch):
+    from app.policy import engine as engine_mod
+
+    path = write_policy(tmp_path, 'allow_domains: ["partner.example.com"]\n')
+    calls = []
+    real_load = engine_mod.yaml.load
+    monkeypatch.setattr(engine_mod.yaml, 'load', lambda f, Loader: calls.append(1) or real_load(f, Loader=Loader))
+
+    first = PolicyEngine.from_file(path)
+    second = PolicyEngine.from_file(path)
+    assert len(calls) == 1
+    assert first.cfg == second.cfg and first.cfg is not second.cfg
+
+    Path(path).write_text('allow_domains: ["other.example.com"]\n', encoding='utf-8')
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    third = PolicyEngine.from_file(path)
+    assert len(calls) == 2
+    assert third.cfg['allow_domains'] == ["other.example.com"]
+
+
+def test_domain_suffix_trie_matches_whole_labels():
+    from app.policy.engine import DomainSuffixTrie
+
+    trie = DomainSuffixTrie(["partner.example.com", "Example.org", ""])
+    assert len(trie) == 2
+    assert trie.matches("partner.example.com")
+    assert trie.matches("api.partner.example.com")
+    assert trie.matches("example.org")
+    assert not trie.matches("example.com")
+    assert not trie.matches("evilpartner.example.com")
+    assert not trie.matches("partner.example.com.evil.net")
+    assert not trie.matches("")
+    assert not DomainSuffixTrie()
+
+
+def test_within_window_day_ranges_and_compiled_cache():
+    import datetime as dt
+    from app.policy.engine import _compile_window
+
+    pe = PolicyEngine.from_dict({})
+    tokyo_monday_10 = dt.datetime(2024, 8, 12, 1, 0, tzinfo=dt.timezone.utc)  # MON 10:00 JST
+    tokyo_sunday_10 = dt.datetime(2024, 8, 11, 1, 0, tzinfo=dt.timezone.utc)  # SUN 10:00 JST
+
+    assert pe._within_window("MON-FRI 09:00-17:00 Asia/Tokyo", tokyo_monday_10)
+    assert not pe._within_window("MON-FRI 09:00-17:00 Asia/Tokyo", tokyo_sunday_10)
+    assert pe._within_window("FRI-MON 09:00-17:00 Asia/Tokyo", tokyo_sunday_10)
+    assert not pe._within_window("MON-FRI 09:00-17:00 Not/AZone", tokyo_monday_10)
+    assert not pe._within_window("garbage", tokyo_monday_10)
+
+    compiled = _compile_window("MON-FRI 09:00-17:00 Asia/Tokyo", day_ranges=True, strict_tz=True)
+    assert compiled.day_mask == 0b0011111
+    assert (compiled.start, compiled.end) == (9 * 60, 17 * 60)
+    assert _compile_window("MON-FRI 09:00-17:00 Asia/Tokyo", day_ranges=True, strict_tz=True) is compiled
+
+
+def test_validate_execution_checks_each_distinct_host():
+    import pytest
+    from app.policy.engine import PolicyViolation
+
+    pe = PolicyEngine.from_dict({'allow_domains': ['partner.example.com']})
+    ok_urls = ['https://partner.example.com/a', 'https://PARTNER.example.com:8443/b'] * 50
+    assert pe.validate_execution({'webx_urls': ok_urls}).allowed is True
+
+    with pytest.raises(PolicyViolation) as exc:
+        pe.validate_execution({'webx_urls': ok_urls + ['https://evil.example.com/x']})
+    assert exc.value.type == 'domain_violation'
+
+
+def test_validate_execution_reports_missing_caps_and_blocked_risks():
+    import pytest
+    from app.policy.engine import PolicyViolation
+
+    pe = PolicyEngine.from_dict({'require_capabilities': ['webx', 'fs'], 'allow_risks': ['sends']})
+
+    with pytest.raises(PolicyViolation) as exc:
+        pe.validate_execution({'required_capabilities': ['webx']})
+    assert exc.value.message == "Missing required capabilities: fs"
+
+    with pytest.raises(PolicyViolation) as exc:
+        pe.validate_execution({'required_capabilities': ['fs', 'webx'],
+                               'risk_flags': ['sends', 'deletes', 'deletes', 'payments']})
+    assert exc.value.message == "Blocked risks: deletes, payments"
+
+
+def test_validate_execution_reports_cheapest_violation_first():
+    import pytest
+    from app.policy.engine import PolicyViolation
+
+    pe = PolicyEngine.from_dict({'allow_domains': ['partner.example.com'], 'require_signed_templates': True})
+
+    with pytest.raises(PolicyViolation) as exc:
+        pe.validate_execution({'webx_urls': ['https://evil.example.com/'], 'signature_verified': False})
+    assert exc.value.type == 'signature_violation'
+
+
+def test_validate_execution_window_compiled_at_construction():
+    import datetime as dt
+    import pytest
+    from app.policy.engine import PolicyViolation
+
+    tokyo_monday_10 = dt.datetime(2024, 8, 12, 1, 0, tzinfo=dt.timezone.utc)  # MON 10:00 JST
+    tokyo_sunday_10 = dt.datetime(2024, 8, 11, 1, 0, tzinfo=dt.timezone.utc)  # SUN 10:00 JST
+
+    pe = PolicyEngine.from_dict({'window': 'MON-FRI 09:00-17:00 Asia/Tokyo', 'autopilot': True})
+    decision = pe.validate_execution({}, current_time=tokyo_monday_10)
+    assert decision.allowed and decision.autopilot
+    with pytest.raises(PolicyViolation) as exc:
+        pe.validate_execution({}, current_time=tokyo_sunday_10)
+    assert exc.value.type == 'window_violation'
+
+    # Missing window means "always"; a malformed one always denies
+    assert PolicyEngine.from_dict({}).validate_execution({}, current_time=tokyo_sunday_10).allowed
+    with pytest.raises(PolicyViolation):
+        PolicyEngine.from_dict({'window': 'garbage'}).validate_execution({}, current_time=tokyo_monday_10)
+
+
+def test_allowed_decisions_are_shared_and_read_only():
+    import dataclasses
+    import pytest
+
+    pe = PolicyEngine.from_dict({'autopilot': True})
+    first = pe.validate_execution({})
+    assert first is pe.validate_execution({})
+    assert first.allowed and first.autopilot and first.warnings == ()
+    assert PolicyEngine.from_dict({}).validate_execution({}).autopilot is False
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.allowed = False
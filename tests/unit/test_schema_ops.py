@@ -0,0 +1,200 @@
+from app.planner.schema_ops import SchemaAnalyzer
+
+
+def test_levenshtein_distance_basic_cases():
+    analyzer = SchemaAnalyzer()
+    assert analyzer._levenshtein_distance("", "") == 0
+    assert analyzer._levenshtein_distance("abc", "") == 3
+    assert analyzer._levenshtein_distance("kitten", "sitting") == 3
+    assert analyzer._levenshtein_distance("submit", "submit form") == 5
+    assert analyzer._levenshtein_distance("送信", "送出") == 1
+
+
+def test_lexical_similarity_is_normalized():
+    analyzer = SchemaAnalyzer()
+    assert analyzer._calculate_lexical_similarity("save", "save") == 1.0
+    assert analyzer._calculate_lexical_similarity("", "save") == 0.0
+    assert abs(analyzer._calculate_lexical_similarity("kitten", "sitting") - (1 - 3 / 7)) < 1e-9
+
+
+def test_semantic_matches_prefer_mapped_synonyms():
+    analyzer = SchemaAnalyzer()
+    elements = [
+        {"text": "提出", "role": "button"},
+        {"text": "Cancel", "role": "button"},
+        {"text": "送信", "role": "button"},
+    ]
+    matches = analyzer.find_semantic_matches("送信", elements)
+    assert [m["text"] for m in matches] == ["提出"]
+    assert matches[0]["similarity"] == 0.9
+
+
+def test_levenshtein_distance_respects_cutoff():
+    analyzer = SchemaAnalyzer()
+    assert analyzer._levenshtein_distance("submit form", "submit", max_distance=2) == 3
+    assert analyzer._levenshtein_distance("kitten", "sitting", max_distance=3) == 3
+    assert analyzer._calculate_lexical_similarity("cancel", "cancellation", 0.7) == 0.0
+    assert analyzer._calculate_lexical_similarity("cancel", "cancels", 0.7) > 0.8
+
+
+def test_semantic_similarity_is_cached_for_both_argument_orders():
+    analyzer = SchemaAnalyzer()
+    first = analyzer._calculate_semantic_similarity("Submit", "send")
+    second = analyzer._calculate_semantic_similarity("SEND", "submit")
+    assert first == second == 0.9
+    info = analyzer._pair_similarity.cache_info()
+    assert info.hits == 1 and info.misses == 1
+
+
+def test_analyze_element_context_nearby_and_same_role():
+    analyzer = SchemaAnalyzer()
+    target = {"text": "OK", "role": "button", "x": 100, "y": 100}
+    schema = {"elements": [
+        target,
+        {"text": "Cancel", "role": "button", "x": 130, "y": 100},
+        {"text": "Help", "role": "link", "x": 110, "y": 100},
+        {"text": "Far", "role": "button", "x": 400, "y": 400},
+    ]}
+    context = analyzer.analyze_element_context(schema, target)
+    assert [e["text"] for e in context["nearby_elements"]] == ["Help", "Cancel"]
+    assert context["nearby_elements"][0]["distance"] == 10
+    assert [e["text"] for e in context["same_role_elements"]] == ["Cancel", "Far"]
+
+
+def test_find_nearby_elements_uses_grid_index_for_large_schemas():
+    analyzer = SchemaAnalyzer()
+    elements = [{"id": i, "x": (i % 20) * 40, "y": (i // 20) * 40} for i in range(200)]
+    schema = {"elements": elements}
+    target = {"x": 400, "y": 200}
+
+    nearby = analyzer.find_nearby_elements(schema, target, radius=45)
+    assert [e["id"] for e in nearby] == [90, 109, 111, 130]
+    assert all(e["distance"] == 40 for e in nearby)
+
+    # Index is reused for the same schema and rebuilt when elements change
+    index = analyzer._schema_index(schema, elements)
+    assert analyzer._schema_index(schema, elements) is index
+    elements.append({"id": 200, "x": 410, "y": 200})
+    assert analyzer.find_nearby_elements(schema, target, radius=45)[0]["id"] == 200
+
+
+def test_cached_index_sees_in_place_edits():
+    analyzer = SchemaAnalyzer()
+    elements = [{"id": i, "x": 20 + (i % 20) * 100, "y": (i // 20) * 100, "role": "text"} for i in range(100)]
+    schema = {"elements": elements}
+    target = {"x": 0, "y": 0, "role": "button"}
+
+    assert [e["id"] for e in analyzer.find_nearby_elements(schema, target, radius=30)] == [0]
+    elements[0]["x"] = 900
+    assert analyzer.find_nearby_elements(schema, target, radius=30) == []
+
+    elements[1]["role"] = "button"
+    context = analyzer.analyze_element_context(schema, target, radius=30)
+    assert [e["id"] for e in context["same_role_elements"]] == [1]
+
+
+def test_extract_ui_vocabulary_buckets_and_dedupes():
+    analyzer = SchemaAnalyzer()
+    schema = {"elements": [
+        {"role": "Button", "text": " OK "},
+        {"role": "submit", "text": "OK"},
+        {"role": "a", "text": "Help"},
+        {"role": "textarea", "text": "Notes"},
+        {"role": "text", "text": "Name"},
+        {"role": "image", "text": "Logo"},
+        {"role": "button", "text": ""},
+    ]}
+    assert analyzer.extract_ui_vocabulary(schema) == {
+        "buttons": ["OK"],
+        "links": ["Help"],
+        "inputs": ["Notes"],
+        "labels": ["Name"],
+    }
+
+
+def test_bit_parallel_and_dp_paths_agree():
+    from app.planner.schema_ops import _myers_distance
+    analyzer = SchemaAnalyzer()
+    assert _myers_distance("sitting", "kitten") == 3
+    assert _myers_distance("a", "") == 1
+    assert _myers_distance("送信ボタン", "送出ボタン") == 1
+
+    # Strings longer than the bit-parallel limit go through the row DP
+    long_a = "x" + "ab" * 40 + "y"
+    long_b = "z" + "ab" * 39 + "ba"
+    assert analyzer._levenshtein_distance(long_a, long_b) == _myers_distance(long_a, long_b)
+
+
+def test_text_replacement_patches_take_top_matches_in_order():
+    from app.planner.schema_ops import PatchGenerator
+    generator = PatchGenerator()
+    elements = [
+        {"text": "Help", "role": "link"},
+        {"text": "send", "role": "button"},
+        {"text": "confirm", "role": "button"},
+        {"text": "submitt", "role": "button"},
+        {"text": "ok", "role": "button"},
+    ]
+    patches = generator.generate_text_replacement_patches("submit", elements, max_suggestions=2)
+    assert [(p["replacement"], p["confidence"]) for p in patches] == [("send", 0.9), ("confirm", 0.9)]
+    full = generator.analyzer.find_semantic_matches("submit", elements)
+    assert [m["text"] for m in full] == ["send", "confirm", "ok", "submitt"]
+    assert abs(full[-1]["similarity"] - (1 - 1 / 7)) < 1e-9
+
+
+def test_proximity_patches_copy_only_nearest_elements():
+    from app.planner.schema_ops import PatchGenerator
+    generator = PatchGenerator()
+    failed = {"text": "Go", "x": 0, "y": 0}
+    elements = [{"id": i, "x": 10 * (8 - i), "y": 0} for i in range(8)]
+    schema = {"elements": elements}
+    patches = generator.generate_proximity_patches(schema, failed, radius=100)
+    assert [p["alternative_element"]["id"] for p in patches] == [7, 6, 5, 4, 3]
+    assert all("distance" not in e for e in elements)
+
+
+def test_analyze_element_context_matches_linear_scan_on_large_schema():
+    analyzer = SchemaAnalyzer()
+    roles = ["button", "link", "textbox"]
+    elements = [
+        {"id": i, "role": roles[i % 3], "x": (i % 10) * 30, "y": (i // 10) * 30}
+        for i in range(90)
+    ]
+    target = elements[44]
+    context = analyzer.analyze_element_context({"elements": elements}, target)
+
+    small = SchemaAnalyzer().analyze_element_context({"elements": elements[:60]}, target)
+    assert [e["id"] for e in context["same_role_elements"]] == [
+        e["id"] for e in elements if e["role"] == target["role"] and e is not target
+    ]
+    assert context["nearby_elements"] == small["nearby_elements"]
+    assert [e["id"] for e in small["nearby_elements"]] == [34, 43, 45, 54, 33, 35, 53, 55]
+
+
+def test_levenshtein_single_character_fast_path():
+    analyzer = SchemaAnalyzer()
+    assert analyzer._levenshtein_distance("a", "banana") == 5
+    assert analyzer._levenshtein_distance("x", "banana") == 6
+    assert analyzer._levenshtein_distance("x", "banana", max_distance=3) == 4
+    assert analyzer._levenshtein_distance("ok", "ok") == 0
+
+
+def test_grid_queries_fall_back_to_linear_scan():
+    import time
+
+    analyzer = SchemaAnalyzer()
+    elements = [{"id": i, "x": (i % 10) * 30, "y": (i // 10) * 30} for i in range(100)]
+    elements[5]["x"] = float("nan")
+    elements[6]["y"] = float("inf")
+    schema = {"elements": elements}
+    target = {"x": 0, "y": 0}
+
+    start = time.perf_counter()
+    everything = analyzer.find_nearby_elements(schema, target, radius=1e5)
+    assert time.perf_counter() - start < 0.1
+    assert len(everything) == 97  # not the target, the NaN or the infinite element
+
+    assert len(analyzer.find_nearby_elements(schema, target, radius=float("inf"))) == 98
+    assert analyzer.find_nearby_elements(schema, {"x": float("nan"), "y": 0}, radius=50) == []
+    assert analyzer.find_nearby_elements(schema, target, radius=-31) == []
+    assert analyzer.analyze_element_context({"elements": elements[:10]}, target, radius=-31)["nearby_elements"] == []
@@ -0,0 +1,124 @@
+from app.screen.schema import count_elements_by_criteria, find_elements_by_text
+from app.screen.web_schema import count_web_elements_by_criteria, find_web_elements_by_text
+
+
+def _schema():
+    return {
+        'elements': [
+            {'role': 'AXWindow', 'label': 'Save dialog', 'children': [
+                {'role': 'AXButton', 'label': 'Save', 'children': [
+                    {'role': 'AXStaticText', 'value': 'save as'},
+                ]},
+                {'role': 'AXButton', 'label': 'Cancel'},
+            ]},
+            {'role': 'AXButton', 'label': 'SAVE'},
+        ]
+    }
+
+
+def test_find_elements_walks_in_document_order():
+    labels = [e.get('label') or e.get('value') for e in find_elements_by_text(_schema(), 'save')]
+    assert labels == ['Save dialog', 'Save', 'save as', 'SAVE']
+    assert [e['label'] for e in find_elements_by_text(_schema(), 'save', 'AXButton')] == ['Save', 'SAVE']
+    assert count_elements_by_criteria(_schema(), role='AXButton') == 3
+    assert count_elements_by_criteria({}) == 0
+
+
+def test_web_helpers_handle_trees_deeper_than_recursion_limit():
+    root = node = {'role': 'generic', 'label': 'row'}
+    for _ in range(5000):
+        child = {'role': 'generic', 'label': 'row'}
+        node['children'] = [child]
+        node = child
+    node['role'] = 'button'
+    schema = {'elements': [root]}
+
+    assert count_web_elements_by_criteria(schema, 'ROW') == 5001
+    assert find_web_elements_by_text(schema, 'row', 'BUTTON') == [node]
+
+
+def test_search_tolerates_missing_label_and_value():
+    schema = {'elements': [{'role': 'AXGroup', 'label': '', 'value': None}, {'role': 'Link', 'label': 'Home'}]}
+    assert count_elements_by_criteria(schema, 'home') == 1
+    assert find_web_elements_by_text(schema, 'HOME', 'link') == [schema['elements'][1]]
+    assert count_web_elements_by_criteria(schema, '') == 2
+
+
+def test_convert_ax_node_preserves_order_and_handles_deep_trees():
+    from app.screen.web_schema import _convert_ax_node_to_element
+
+    element = _convert_ax_node_to_element({
+        'role': 'WebArea', 'name': 'Page', 'boundingBox': {'x': 5, 'width': 10},
+        'children': [{'role': 'button', 'name': 'A'}, {'role': 'link', 'name': 'B', 'value': '/b'}],
+    })
+    assert list(element) == ['role', 'label', 'value', 'bounds', 'children']
+    assert element['bounds'] == {'x': 5, 'y': 0, 'width': 10, 'height': 0}
+    assert [(c['label'], c['value']) for c in element['children']] == [('A', ''), ('B', '/b')]
+    assert 'bounds' not in element['children'][0]
+
+    root = node = {'role': 'generic'}
+    for depth in range(5000):
+        node['children'] = [{'role': 'generic', 'name': str(depth)}]
+        node = node['children'][0]
+    converted = _convert_ax_node_to_element(root)
+    for _ in range(5000):
+        converted = converted['children'][0]
+    assert converted == {'role': 'generic', 'label': '4999', 'value': '', 'children': []}
+
+
+def test_capture_falls_back_to_osascript_without_pyobjc(monkeypatch):
+    import subprocess
+    from types import SimpleNamespace
+    from app.screen import schema as schema_module
+
+    def no_pyobjc():
+        raise ImportError('No module named AppKit')
+
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[0])
+        return SimpleNamespace(returncode=0, stdout='Finder, Documents\n')
+
+    monkeypatch.setattr(schema_module, '_frontmost_names_via_pyobjc', no_pyobjc)
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    captured = schema_module.capture_macos_screen_schema()
+    assert calls == ['osascript']
+    app = captured['elements'][0]
+    assert (app['label'], app['children'][0]['label']) == ('Finder', 'Documents')
+
+    monkeypatch.setattr(schema_module, '_frontmost_names_via_pyobjc', lambda: ('Mail', 'Inbox'))
+    captured = schema_module.capture_macos_screen_schema()
+    assert calls == ['osascript']
+    assert captured['elements'][0]['children'][0]['label'] == 'Inbox'
+
+
+def test_pyobjc_capture_reads_titles_from_application_services(monkeypatch):
+    import sys
+    import types
+    from app.screen import schema as schema_module
+
+    focused_window = object()
+    values = {
+        ('app:4242', 'AXFocusedWindow'): focused_window,
+        (focused_window, 'AXTitle'): 'Inbox',
+    }
+
+    front_app = types.SimpleNamespace(processIdentifier=lambda: 4242, localizedName=lambda: 'Mail')
+    workspace = types.SimpleNamespace(frontmostApplication=lambda: front_app)
+    appkit = types.ModuleType('AppKit')
+    appkit.NSWorkspace = types.SimpleNamespace(sharedWorkspace=lambda: workspace)
+    services = types.ModuleType('ApplicationServices')
+    services.AXUIElementCreateApplication = lambda pid: f'app:{pid}'
+    services.AXUIElementCopyAttributeValue = lambda element, attribute, _: (0, values.get((element, attribute)))
+    services.kAXFocusedWindowAttribute = 'AXFocusedWindow'
+    services.kAXTitleAttribute = 'AXTitle'
+    monkeypatch.setitem(sys.modules, 'AppKit', appkit)
+    monkeypatch.setitem(sys.modules, 'ApplicationServices', services)
+
+    assert schema_module._frontmost_names_via_pyobjc() == ('Mail', 'Inbox')
+    app = schema_module.capture_macos_screen_schema()['elements'][0]
+    assert (app['label'], app['children'][0]['label']) == ('Mail', 'Inbox')
+
+    values.pop(('app:4242', 'AXFocusedWindow'))
+    assert schema_module._frontmost_names_via_pyobjc() is None
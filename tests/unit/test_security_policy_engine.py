@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.security import policy_engine as policy_module
+
+
+def test_get_policy_engine_constructs_once_per_config_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(policy_module, '_policy_engines', {})
+    real_init = policy_module.PolicyEngine.__init__
+
+    with patch.object(policy_module.PolicyEngine, '__init__', autospec=True,
+                      side_effect=real_init) as mock_init:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            engines = list(pool.map(lambda _: policy_module.get_policy_engine(tmp_path), range(32)))
+
+        assert all(engine is engines[0] for engine in engines)
+        assert mock_init.call_count == 1
+
+        other = policy_module.get_policy_engine(tmp_path / 'other')
+        assert other is not engines[0]
+        assert mock_init.call_count == 2
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+import zoneinfo
+
+import pytest
+
+from app.policy import engine, time_window
+from app.policy.time_window import TimeWindow, TimeWindowParser
+
+
+def test_timezone_resolved_once_per_zone_name():
+    engine._tz.cache_clear()
+    time_window.parse_window.cache_clear()
+    parser = TimeWindowParser()
+    first = parser.parse("MON-FRI 09:00-17:00 Asia/Tokyo")
+    second = parser.parse("SAT 00:00-06:00 Asia/Tokyo")
+
+    assert first._tz is second._tz is zoneinfo.ZoneInfo("Asia/Tokyo")
+    assert engine._tz.cache_info().currsize == 1
+
+    monday_10_jst = datetime(2024, 8, 12, 1, 0, tzinfo=timezone.utc)
+    assert first.is_allowed(monday_10_jst)
+    assert not second.is_allowed(monday_10_jst)
+
+
+def test_malformed_window_rejected_at_construction():
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        TimeWindow(days=["MON"], start_time="09:00", end_time="17:00", timezone="Not/AZone")
+    with pytest.raises(ValueError):
+        TimeWindow(days=["MON"], start_time="09:00", end_time="24:00", timezone="UTC")
+
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        TimeWindowParser().parse("MON 09:00-17:00 Not/AZone")
+
+
+def test_window_fields_precomputed_and_frozen():
+    import dataclasses
+
+    window = TimeWindowParser().parse("MON,WED-FRI 09:30-17:00 UTC")
+    assert window.days == ("MON", "WED", "THU", "FRI")
+    assert window.days_mask == 0b0011101
+    assert (window.start_minutes, window.end_minutes) == (570, 1020)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        window.start_time = "00:00"
+
+    monday = datetime(2024, 8, 12, tzinfo=timezone.utc)
+    assert window.is_allowed(monday.replace(hour=17))
+    assert not window.is_allowed(monday.replace(hour=17, second=1))
+    assert not window.is_allowed(monday.replace(hour=9, minute=29))
+
+
+def test_overnight_window_spans_into_following_morning():
+    window = TimeWindowParser().parse("SUN 23:00-06:00 UTC")
+    sunday_2330 = datetime(2024, 8, 11, 23, 30, tzinfo=timezone.utc)
+    monday_0500 = datetime(2024, 8, 12, 5, 0, tzinfo=timezone.utc)
+
+    assert window.is_allowed(sunday_2330)
+    assert window.is_allowed(monday_0500)
+    # Sunday's early morning belongs to Saturday night; Monday's evening to
+    # Monday night
+    assert not window.is_allowed(sunday_2330.replace(hour=3))
+    assert not window.is_allowed(monday_0500.replace(hour=23))
+
+
+def test_parse_shares_window_per_string():
+    parser = TimeWindowParser()
+    window = parser.parse("MON-FRI 09:00-17:00 UTC")
+    assert TimeWindowParser().parse("MON-FRI 09:00-17:00 UTC") is window
+    assert time_window.parse_window("MON-FRI 09:00-17:00 UTC") is window
+
+    # Failures are not cached
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Invalid time window format"):
+            parser.parse("MON-FRI 9-17 UTC")
+
+
+def test_round_the_clock_window_always_allows():
+    window = TimeWindowParser().parse("MON-SUN 00:00-23:59 UTC")
+    assert window._always_allowed
+    assert window.is_allowed(datetime(2024, 8, 11, 23, 59, 30, tzinfo=timezone.utc))
+    assert window.is_allowed(datetime(2024, 8, 12, 0, 0))
+
+    assert not TimeWindowParser().parse("MON-SAT 00:00-23:59 UTC")._always_allowed
+    assert not TimeWindowParser().parse("MON-SUN 00:00-23:58 UTC")._always_allowed